@@ -1,6 +1,7 @@
 """Core anonymization logic -- copy-then-anonymize, in-place, and batch processing.
 
-Supports both sequential and parallel (thread pool) batch processing.
+Supports both sequential and parallel (thread pool) batch processing;
+scan_batch can also use a process pool for CPU-bound regex scanning.
 """
 
 import hashlib
@@ -10,7 +11,9 @@ import shutil
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, as_completed,
+)
 from pathlib import Path
 from typing import Callable, List, Optional
 
@@ -23,9 +26,20 @@ from pathsafe.models import AnonymizationResult, BatchResult, PreflightResult
 WSI_EXTENSIONS = {'.ndpi', '.svs', '.tif', '.tiff', '.scn', '.bif',
                    '.mrxs', '.dcm', '.dicom'}
 
+# Extensions collected for each --format filter value
+FORMAT_EXTENSIONS = {
+    'ndpi': {'.ndpi'}, 'svs': {'.svs'}, 'tiff': {'.tif', '.tiff'},
+    'mrxs': {'.mrxs'}, 'bif': {'.bif'}, 'scn': {'.scn'},
+    'dicom': {'.dcm', '.dicom'},
+}
+
 # Default number of parallel workers
 DEFAULT_WORKERS = 4
 
+# Read size for the output checksum; 1 MiB amortizes per-read overhead
+# while still giving fine-grained progress on multi-GB slides
+_CHECKSUM_CHUNK_SIZE = 1 << 20
+
 
 def preflight_check(files: List[Path],
                     output_dir: Optional[Path] = None) -> PreflightResult:
@@ -99,7 +113,8 @@ def preflight_check(files: List[Path],
     return result
 
 
-def _verify_image_integrity(filepath: Path, pre_hashes: dict) -> Optional[bool]:
+def _verify_image_integrity(filepath: Path, pre_hashes: dict,
+                            algorithm: str = 'sha256') -> Optional[bool]:
     """Compare pre-anonymization tile hashes with post-anonymization hashes.
 
     Returns True if all non-blanked IFDs match, False if any mismatch,
@@ -124,7 +139,7 @@ def _verify_image_integrity(filepath: Path, pre_hashes: dict) -> Optional[bool]:
                 # Skip IFDs that were intentionally blanked (label/macro)
                 if is_ifd_image_blanked(f, header, entries):
                     continue
-                post_hash = compute_ifd_tile_hash(f, header, entries)
+                post_hash = compute_ifd_tile_hash(f, header, entries, algorithm)
                 if post_hash is None:
                     continue
                 if post_hash != pre_hashes[ifd_offset]:
@@ -146,6 +161,7 @@ def anonymize_file(
     phase_callback: Optional[Callable] = None,
     io_semaphore: Optional[threading.Semaphore] = None,
     compute_checksum: bool = False,
+    integrity_hash: str = 'sha256',
 ) -> AnonymizationResult:
     """Anonymize a single WSI file.
 
@@ -157,6 +173,8 @@ def anonymize_file(
         dry_run: If True, only scan -- don't modify anything.
         reset_timestamps: If True, reset file access/modification times to epoch.
         verify_integrity: If True, verify image tile data integrity via SHA-256.
+        integrity_hash: Tile hash used by verify_integrity: 'sha256' or
+                        'blake3' (faster, needs the blake3 package).
 
     Returns:
         AnonymizationResult with details of what was done.
@@ -242,7 +260,7 @@ def anonymize_file(
             if phase_callback:
                 phase_callback("Hashing tiles", filepath)
             from pathsafe.tiff import compute_image_hashes
-            pre_hashes = compute_image_hashes(target)
+            pre_hashes = compute_image_hashes(target, integrity_hash)
         finally:
             if io_semaphore:
                 io_semaphore.release()
@@ -277,7 +295,8 @@ def anonymize_file(
         try:
             if phase_callback:
                 phase_callback("Verifying integrity", filepath)
-            integrity_result = _verify_image_integrity(target, pre_hashes)
+            integrity_result = _verify_image_integrity(target, pre_hashes,
+                                                       integrity_hash)
         finally:
             if io_semaphore:
                 io_semaphore.release()
@@ -308,13 +327,16 @@ def anonymize_file(
                 h = hashlib.sha256()
                 hashed = 0
                 last_pct = -1
+                # One reused buffer instead of a new bytes object per chunk
+                buf = bytearray(_CHECKSUM_CHUNK_SIZE)
+                view = memoryview(buf)
                 with open(str(target), 'rb') as fh:
                     while True:
-                        chunk = fh.read(65536)
-                        if not chunk:
+                        n = fh.readinto(buf)
+                        if not n:
                             break
-                        h.update(chunk)
-                        hashed += len(chunk)
+                        h.update(view[:n])
+                        hashed += n
                         if phase_callback and target_size > 0:
                             new_pct = int(hashed * 100 / target_size)
                             if new_pct > last_pct:
@@ -370,12 +392,7 @@ def collect_wsi_files(path: Path, format_filter: Optional[str] = None) -> List[P
     """
     if path.is_file():
         if format_filter:
-            ext_map = {
-                'ndpi': {'.ndpi'}, 'svs': {'.svs'}, 'tiff': {'.tif', '.tiff'},
-                'mrxs': {'.mrxs'}, 'bif': {'.bif'}, 'scn': {'.scn'},
-                'dicom': {'.dcm', '.dicom'},
-            }
-            allowed = ext_map.get(format_filter, WSI_EXTENSIONS)
+            allowed = FORMAT_EXTENSIONS.get(format_filter, WSI_EXTENSIONS)
             if path.suffix.lower() not in allowed:
                 return []
         elif path.suffix.lower() not in WSI_EXTENSIONS:
@@ -384,12 +401,7 @@ def collect_wsi_files(path: Path, format_filter: Optional[str] = None) -> List[P
 
     extensions = WSI_EXTENSIONS
     if format_filter:
-        ext_map = {
-            'ndpi': {'.ndpi'}, 'svs': {'.svs'}, 'tiff': {'.tif', '.tiff'},
-            'mrxs': {'.mrxs'}, 'bif': {'.bif'}, 'scn': {'.scn'},
-            'dicom': {'.dcm', '.dicom'},
-        }
-        extensions = ext_map.get(format_filter, WSI_EXTENSIONS)
+        extensions = FORMAT_EXTENSIONS.get(format_filter, WSI_EXTENSIONS)
 
     files = []
     for root, _, filenames in os.walk(path):
@@ -587,6 +599,34 @@ def _batch_parallel(
     return [r for r in results if r is not None]
 
 
+def _init_scan_process(byte_patterns, string_patterns, date_patterns) -> None:
+    """Process pool initializer: install the parent's PHI pattern lists.
+
+    A spawned worker imports pathsafe.scanner afresh, which would drop
+    patterns loaded at runtime (pathsafe scan --patterns).
+    """
+    from pathsafe import scanner
+    scanner.PHI_BYTE_PATTERNS = byte_patterns
+    scanner.PHI_STRING_PATTERNS = string_patterns
+    scanner.DATE_BYTE_PATTERNS = date_patterns
+
+
+def _scan_indexed(index: int, filepath: Path):
+    """Scan one file for a pool worker, returning (index, filepath, result).
+
+    Module-level so process pools can pickle it. Errors become an error
+    ScanResult rather than propagating.
+    """
+    from pathsafe.models import ScanResult
+    try:
+        return index, filepath, get_handler(filepath).scan(filepath)
+    except Exception as e:
+        return index, filepath, ScanResult(
+            filepath=filepath, format="unknown",
+            is_clean=False, file_size=0, error=str(e),
+        )
+
+
 def scan_batch(
     input_path: Path,
     format_filter: Optional[str] = None,
@@ -594,6 +634,7 @@ def scan_batch(
     workers: int = 1,
     stop_check: Optional[Callable] = None,
     file_list: Optional[List[Path]] = None,
+    processes: bool = False,
 ) -> List:
     """Scan a batch of WSI files for PHI (read-only).
 
@@ -604,11 +645,13 @@ def scan_batch(
         workers: Number of parallel workers. 1 = sequential (default).
         stop_check: Optional callable returning True to abort immediately.
         file_list: If provided, use these files instead of collecting from input_path.
+        processes: Run parallel workers as processes instead of threads.
+            Regex scanning holds the GIL, so processes scale with cores on
+            large batches at the cost of worker startup.
 
     Returns:
         List of (filepath, ScanResult) tuples.
     """
-    from pathsafe.formats import get_handler
     from pathsafe.models import ScanResult
 
     if file_list:
@@ -631,22 +674,24 @@ def scan_batch(
         lock = threading.Lock()
         completed = [0]
 
-        def _do_scan(index, filepath):
-            try:
-                return index, filepath, scan_one(filepath)
-            except Exception as e:
-                return index, filepath, ScanResult(
-                    filepath=filepath, format="unknown",
-                    is_clean=False, file_size=0, error=str(e),
-                )
+        if processes:
+            from pathsafe import scanner
+            executor = ProcessPoolExecutor(
+                max_workers=min(workers, total),
+                initializer=_init_scan_process,
+                initargs=(scanner.PHI_BYTE_PATTERNS,
+                          scanner.PHI_STRING_PATTERNS,
+                          scanner.DATE_BYTE_PATTERNS))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
 
         ordered = [None] * total
-        with ThreadPoolExecutor(max_workers=workers) as executor:
+        with executor:
             futures = {}
             for i, fp in enumerate(files):
                 if stop_check and stop_check():
                     break
-                future = executor.submit(_do_scan, i, fp)
+                future = executor.submit(_scan_indexed, i, fp)
                 futures[future] = i
 
             for future in as_completed(futures):
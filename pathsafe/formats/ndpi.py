@@ -280,9 +280,9 @@ class NDPIHandler(TiffFormatHandler):
                        entry.dtype in (2, 7) and \
                        entry.value_offset not in seen_offsets:
                         raw = read_tag_value_bytes(f, entry)
-                        if raw and raw != b'\x00' * len(raw):
-                            stripped = raw.rstrip(b'\x00')
-                            if stripped and not all(b == ord('X') for b in stripped) \
+                        stripped = raw.rstrip(b'\x00')
+                        if stripped:
+                            if stripped.count(b'X') != len(stripped) \
                                and _is_printable_content(stripped):
                                 seen_offsets.add(entry.value_offset)
                                 value = stripped.decode('ascii', errors='replace')[:50]
@@ -536,9 +536,9 @@ class NDPIHandler(TiffFormatHandler):
                        entry.dtype in (2, 7) and \
                        entry.value_offset not in seen_offsets:
                         raw = read_tag_value_bytes(f, entry)
-                        if raw and raw != b'\x00' * len(raw):
-                            stripped = raw.rstrip(b'\x00')
-                            if stripped and not all(b == ord('X') for b in stripped) \
+                        stripped = raw.rstrip(b'\x00')
+                        if stripped:
+                            if stripped.count(b'X') != len(stripped) \
                                and _is_printable_content(stripped):
                                 seen_offsets.add(entry.value_offset)
                                 value = stripped.decode('ascii', errors='replace')[:50]
@@ -14,6 +14,7 @@ Features:
 - Format filtering, dry-run mode, and log export
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -25,6 +26,9 @@ from pathsafe.gui.window import PathSafeWindow
 
 def main():
     """Launch the PathSafe Qt GUI."""
+    # A no-op unless frozen; there it must run before anything else so
+    # process-pool workers started from the executable don't open a window
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     app.setStyleSheet(DARK_QSS)
@@ -14,7 +14,9 @@ from pathsafe.log import (
     html_dim, html_error, html_finding, html_header, html_info,
     html_separator, html_success, html_summary_line, html_warning,
 )
-from pathsafe.report import generate_certificate, generate_scan_report, friendly_tag_name
+from pathsafe.report import (
+    generate_certificate, generate_scan_report, friendly_tag_name, sha256_files,
+)
 from pathsafe.verify import verify_batch
 
 
@@ -139,6 +141,22 @@ class ScanWorker(QThread):
             # Generate scan report PDF
             scan_report_path = ''
             try:
+                # SHA-256 is only shown in the scan report, so hash here
+                # rather than for every scan; Stop skips the remaining files
+                if results_json and not self._stop:
+                    def on_hashed(done, total_files, filepath):
+                        self.signals.progress.emit(done / total_files * 100)
+                        self.signals.status.emit(
+                            f'Computing checksums {done}/{total_files}: '
+                            f'{filepath.name}')
+
+                    hashes = sha256_files(
+                        [Path(e['filepath']) for e in results_json],
+                        progress_callback=on_hashed,
+                        stop_check=lambda: self._stop)
+                    for entry in results_json:
+                        entry['sha256'] = hashes[Path(entry['filepath'])]
+
                 scan_data = {
                     'total': total,
                     'clean': clean,
@@ -371,16 +389,18 @@ class AnonymizeWorker(QThread):
                 self.signals.log.emit(
                     html_warning('DRY RUN - no files were modified.'))
 
-            # Count integrity results
-            integrity_verified = sum(
-                1 for r in batch_result.results
-                if r.image_integrity_verified is True)
-            integrity_failed = sum(
-                1 for r in batch_result.results
-                if r.image_integrity_verified is False)
-            phi_filenames = sum(
-                1 for r in batch_result.results
-                if r.filename_has_phi)
+            # Count integrity results and PHI filenames in one pass
+            integrity_verified = integrity_failed = phi_filenames = 0
+            output_paths = []
+            for r in batch_result.results:
+                if r.image_integrity_verified is True:
+                    integrity_verified += 1
+                elif r.image_integrity_verified is False:
+                    integrity_failed += 1
+                if r.filename_has_phi:
+                    phi_filenames += 1
+                if not r.error:
+                    output_paths.append(str(r.output_path))
 
             # Log filename PHI warning in summary
             if phi_filenames:
@@ -403,10 +423,7 @@ class AnonymizeWorker(QThread):
                 'integrity_verified': integrity_verified,
                 'integrity_failed': integrity_failed,
                 'phi_filenames': phi_filenames,
-                'output_paths': [
-                    str(r.output_path) for r in batch_result.results
-                    if not r.error
-                ],
+                'output_paths': output_paths,
             })
             if batch_result.files_errored == 0:
                 self.signals.status.emit('Anonymization complete')
@@ -8,103 +8,510 @@ This module provides extra capabilities when openslide-python is installed:
 All functions gracefully handle the case where OpenSlide is not installed.
 """
 
+import atexit
+import contextlib
+import functools
+import importlib.util
+import os
+import stat
+import struct
+import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import (
+    Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple,
+    TypedDict, Union,
+)
 
-try:
-    import openslide
-    HAS_OPENSLIDE = True
-except ImportError:
-    HAS_OPENSLIDE = False
+from pathsafe.tiff.parser import read_header, read_ifd, read_tag_value_bytes
+
+# Probe for openslide without importing it -- the import loads libopenslide
+# and its codec libraries, which callers that never read a slide shouldn't pay.
+# This only says the Python package is installed; is_available() also checks
+# that the native library loads.
+HAS_OPENSLIDE = importlib.util.find_spec('openslide') is not None
+
+# Lazy-loaded on first real use
+_openslide = None
+_numpy = None
+
+# Why the first import failed (e.g. libopenslide missing); not retried
+_openslide_load_error: Optional[str] = None
+
+# Errors treated as "slide can't be read". Widened with OpenSlideError
+# once openslide is imported; ImportError covers a missing libopenslide.
+_OPENSLIDE_ERRORS = (OSError, ImportError)
+
+
+def _get_openslide():
+    global _openslide, _OPENSLIDE_ERRORS, _openslide_load_error
+    if _openslide is None:
+        if _openslide_load_error is not None:
+            raise ImportError(_openslide_load_error)
+        try:
+            import openslide
+        except (OSError, ImportError) as e:
+            _openslide_load_error = f"OpenSlide could not be loaded: {e}"
+            raise ImportError(_openslide_load_error) from e
+        _openslide = openslide
+        _OPENSLIDE_ERRORS = (OSError, ImportError, openslide.OpenSlideError)
+    return _openslide
+
+
+def _require_numpy():
+    global _numpy
+    if _numpy is not None:
+        return _numpy
+    try:
+        import numpy
+        _numpy = numpy
+        return numpy
+    except ImportError:
+        raise ImportError(
+            "numpy is required for columnar slide scans. "
+            "Install it with: pip install pathsafe[convert]"
+        )
+
+
+def _probe(path: str) -> Optional[int]:
+    """Return the mtime (ns) of a readable regular file, else None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode) or not os.access(path, os.R_OK):
+        return None
+    return st.st_mtime_ns
 
 
 def is_available() -> bool:
-    """Check if OpenSlide is installed and available."""
-    return HAS_OPENSLIDE
+    """Check if OpenSlide is installed and its native library loads.
+
+    The first call imports openslide; a failed load is remembered, so
+    neither this nor the slide helpers retry it.
+    """
+    if not HAS_OPENSLIDE:
+        return False
+    try:
+        _get_openslide()
+    except ImportError:
+        return False
+    return True
+
+
+class _HandlePool:
+    """Bounded LRU pool of open OpenSlide handles, keyed by absolute path.
+
+    The pool owns the handles: callers borrow one with ``lease()`` and use
+    it only inside the with-block, never closing it. A handle whose file
+    has changed on disk (different mtime) is replaced by a fresh one.
+    Handles dropped from the pool (evicted, replaced, close_all()) while
+    another thread still holds a lease are closed when the last lease ends.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._handles: OrderedDict = OrderedDict()  # key -> (mtime_ns, slide)
+        self._leases: Dict[int, int] = {}  # id(slide) -> active lease count
+        self._retired: set = set()  # ids of dropped slides still leased
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def lease(self, path: str, mtime_ns: int) -> Iterator[Any]:
+        """Borrow the pooled handle for *path*, opening it if needed."""
+        slide = self._acquire(path, mtime_ns)
+        try:
+            yield slide
+        finally:
+            self._release(slide)
 
+    def _acquire(self, path: str, mtime_ns: int):
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._handles.get(key)
+            if entry is not None and entry[0] == mtime_ns:
+                self._handles.move_to_end(key)
+                slide = entry[1]
+            else:
+                if entry is not None:
+                    del self._handles[key]
+                    self._retire(entry[1])
+                slide = _get_openslide().OpenSlide(path)
+                self._handles[key] = (mtime_ns, slide)
+                while len(self._handles) > self.maxsize:
+                    _, (_, evicted) = self._handles.popitem(last=False)
+                    self._retire(evicted)
+            self._leases[id(slide)] = self._leases.get(id(slide), 0) + 1
+            return slide
 
-def detect_vendor(filepath: Path) -> Optional[str]:
+    def _release(self, slide) -> None:
+        with self._lock:
+            count = self._leases[id(slide)] - 1
+            if count:
+                self._leases[id(slide)] = count
+                return
+            del self._leases[id(slide)]
+            if id(slide) in self._retired:
+                self._retired.discard(id(slide))
+                slide.close()
+
+    def _retire(self, slide) -> None:
+        """Close a slide dropped from the pool, or defer it while leased."""
+        if id(slide) in self._leases:
+            self._retired.add(id(slide))
+        else:
+            slide.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            while self._handles:
+                _, (_, slide) = self._handles.popitem()
+                self._retire(slide)
+
+
+_POOL = _HandlePool()
+atexit.register(_POOL.close_all)
+
+
+def close_handles() -> None:
+    """Close every pooled OpenSlide handle.
+
+    Call before modifying slides in place on platforms (Windows) where an
+    open handle blocks writes.
+    """
+    _POOL.close_all()
+
+
+# Vendor names come from a small fixed set; share one str object per name
+# across large scans instead of one per slide.
+_VENDOR_INTERN: Dict[str, str] = {}
+
+
+def _intern_vendor(vendor: Optional[str]) -> Optional[str]:
+    if vendor is None:
+        return None
+    return _VENDOR_INTERN.setdefault(vendor, sys.intern(vendor))
+
+
+# TIFF byte-order + version markers (classic and BigTIFF)
+_TIFF_MAGIC = (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+')
+
+# TIFF-based formats whose vendor is suggested by the extension
+_TIFF_VENDOR_BY_EXT = {
+    '.ndpi': 'hamamatsu',
+    '.scn': 'leica',
+}
+
+# First-IFD markers OpenSlide itself checks for: the NDPI_FORMAT_FLAG tag,
+# and the SCN XML namespace in ImageDescription
+_NDPI_FORMAT_FLAG = 65420
+_LEICA_SCN_NAMESPACE = b'leica-microsystems.com/scn'
+
+# VL Whole Slide Microscopy Image Storage, in the DICOM file meta header;
+# other DICOM objects (CT, reports, ...) are not slides
+_WSI_SOP_CLASS_UID = b'1.2.840.10008.5.1.4.1.1.77.1.6'
+
+
+def _tiff_marks_vendor(f, vendor: str) -> bool:
+    """Check the first IFD for the marker of an extension-suggested vendor."""
+    header = read_header(f)
+    if header is None:
+        return False
+    entries, _ = read_ifd(f, header, header.first_ifd_offset)
+    if vendor == 'hamamatsu':
+        return any(e.tag_id == _NDPI_FORMAT_FLAG for e in entries)
+    for entry in entries:
+        if entry.tag_id == 270:  # ImageDescription
+            return _LEICA_SCN_NAMESPACE in read_tag_value_bytes(f, entry)
+    return False
+
+
+def _sniff_vendor(path: str) -> Optional[str]:
+    """Identify the vendor from the file header without OpenSlide.
+
+    Extension and magic bytes only suggest a vendor; it is returned only
+    when the content confirms it (NDPI flag tag, SCN namespace, DICOM
+    whole-slide SOP class, MRXS Slidedat.ini). Anything else -- .svs and
+    plain .tif, or a .ndpi/.dcm that isn't a slide -- returns None and
+    OpenSlide decides.
+    """
+    stem, ext = os.path.splitext(path)
+    ext = ext.lower()
+    with open(path, 'rb') as f:
+        head = f.read(1024)
+        if head[:4] in _TIFF_MAGIC:
+            vendor = _TIFF_VENDOR_BY_EXT.get(ext)
+            try:
+                if vendor is not None and _tiff_marks_vendor(f, vendor):
+                    return vendor
+            except struct.error:
+                pass
+            return None
+    if head[128:132] == b'DICM':
+        return 'dicom' if _WSI_SOP_CLASS_UID in head[132:] else None
+    if ext == '.mrxs' and os.path.isfile(os.path.join(stem, 'Slidedat.ini')):
+        return 'mirax'
+    return None
+
+
+def detect_vendor(filepath: Union[str, os.PathLike]) -> Optional[str]:
     """Detect the slide vendor using OpenSlide.
 
     Returns vendor string (e.g., "hamamatsu", "aperio", "mirax",
-    "ventana", "leica", "generic-tiff") or None.
+    "ventana", "leica", "generic-tiff") or None. Files whose header
+    confirms the vendor are answered without calling OpenSlide.
     """
-    if not HAS_OPENSLIDE:
+    path = os.fspath(filepath)
+    if _probe(path) is None:
         return None
     try:
-        return openslide.OpenSlide.detect_format(str(filepath))
-    except Exception:
+        vendor = _sniff_vendor(path)
+        if vendor is not None:
+            return vendor
+        return _intern_vendor(_get_openslide().OpenSlide.detect_format(path))
+    except _OPENSLIDE_ERRORS:
         return None
 
 
-def get_properties(filepath: Path) -> Dict[str, str]:
+_EMPTY_PROPERTIES: Mapping[str, str] = MappingProxyType({})
+
+
+@functools.lru_cache(maxsize=128)
+def _properties(path: str, mtime_ns: int) -> Mapping[str, str]:
+    """Copy the slide's properties once and cache a read-only view of them."""
+    with _POOL.lease(path, mtime_ns) as slide:
+        return MappingProxyType(
+            {sys.intern(k): v for k, v in slide.properties.items()})
+
+
+def get_properties(filepath: Union[str, os.PathLike]) -> Mapping[str, str]:
     """Read all slide properties via OpenSlide.
 
-    Returns a dict of property name -> value. Common properties include:
+    Returns a read-only mapping of property name -> value, cached per file
+    version; use ``dict(...)`` for a mutable copy. Common properties include:
     - openslide.vendor
     - openslide.objective-power
     - openslide.mpp-x, openslide.mpp-y (microns per pixel)
     - openslide.level-count
     - Format-specific properties (e.g., hamamatsu.*, aperio.*)
     """
-    if not HAS_OPENSLIDE:
-        return {}
+    path = os.fspath(filepath)
+    mtime_ns = _probe(path)
+    if mtime_ns is None:
+        return _EMPTY_PROPERTIES
     try:
-        with openslide.OpenSlide(str(filepath)) as slide:
-            return dict(slide.properties)
-    except Exception:
-        return {}
+        return _properties(path, mtime_ns)
+    except _OPENSLIDE_ERRORS:
+        return _EMPTY_PROPERTIES
 
 
-def get_associated_image_names(filepath: Path) -> List[str]:
-    """List available associated images (e.g., 'label', 'macro', 'thumbnail').
+@functools.lru_cache(maxsize=128)
+def _associated_names(path: str, mtime_ns: int) -> FrozenSet[str]:
+    """Read the slide's associated image names once and cache them.
 
-    Returns empty list if OpenSlide is not available or file can't be opened.
+    Keyed on the file's mtime so a rewritten slide is re-read.
     """
-    if not HAS_OPENSLIDE:
-        return []
+    with _POOL.lease(path, mtime_ns) as slide:
+        return frozenset(slide.associated_images)
+
+
+def _associated_names_set(filepath: Union[str, os.PathLike]) -> FrozenSet[str]:
+    path = os.fspath(filepath)
+    mtime_ns = _probe(path)
+    if mtime_ns is None:
+        return frozenset()
     try:
-        with openslide.OpenSlide(str(filepath)) as slide:
-            return list(slide.associated_images.keys())
-    except Exception:
-        return []
+        return _associated_names(path, mtime_ns)
+    except _OPENSLIDE_ERRORS:
+        return frozenset()
 
 
-def has_label_image(filepath: Path) -> bool:
+def get_associated_image_names(filepath: Union[str, os.PathLike]) -> List[str]:
+    """List available associated images (e.g., 'label', 'macro', 'thumbnail').
+
+    Names are returned sorted. Returns empty list if OpenSlide is not
+    available or file can't be opened.
+    """
+    return sorted(_associated_names_set(filepath))
+
+
+def has_label_image(filepath: Union[str, os.PathLike]) -> bool:
     """Check if the slide has a label associated image."""
-    return 'label' in get_associated_image_names(filepath)
+    return 'label' in _associated_names_set(filepath)
 
 
-def has_macro_image(filepath: Path) -> bool:
+def has_macro_image(filepath: Union[str, os.PathLike]) -> bool:
     """Check if the slide has a macro associated image."""
-    return 'macro' in get_associated_image_names(filepath)
+    return 'macro' in _associated_names_set(filepath)
+
 
+class SlideInfo(TypedDict, total=False):
+    """Shape of the dict returned by get_slide_info()."""
+    openslide_available: bool
+    vendor: str
+    level_count: int
+    dimensions: Tuple[int, int]
+    level_dimensions: Tuple[Tuple[int, int], ...]
+    objective_power: Optional[float]
+    mpp_x: Optional[float]
+    mpp_y: Optional[float]
+    associated_images: List[str]
+    property_count: int
+    error: str
 
-def get_slide_info(filepath: Path) -> Dict:
+
+def _safe_float(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric property string, returning None if absent or invalid."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_slide_info(filepath: Union[str, os.PathLike]) -> SlideInfo:
     """Get comprehensive slide information via OpenSlide.
 
     Returns a dict with vendor, dimensions, magnification, level info,
-    associated images, and all properties.
+    associated images, and all properties. Objective power and mpp are
+    parsed to floats (None when missing or malformed).
     """
-    if not HAS_OPENSLIDE:
+    if not is_available():
         return {'openslide_available': False}
-
-    info = {'openslide_available': True}
+    info: SlideInfo = {'openslide_available': True}
+    path = os.fspath(filepath)
+    mtime_ns = _probe(path)
+    if mtime_ns is None:
+        info['error'] = f'Not a readable file: {path}'
+        return info
     try:
-        with openslide.OpenSlide(str(filepath)) as slide:
-            info['vendor'] = slide.properties.get(
-                'openslide.vendor', 'unknown')
+        # Properties and associated names come from the per-file caches;
+        # each slide.properties access would otherwise build a new map.
+        props = _properties(path, mtime_ns)
+        info['vendor'] = _intern_vendor(
+            props.get('openslide.vendor', 'unknown'))
+        with _POOL.lease(path, mtime_ns) as slide:
             info['level_count'] = slide.level_count
             info['dimensions'] = slide.dimensions
             info['level_dimensions'] = slide.level_dimensions
-            info['objective_power'] = slide.properties.get(
-                'openslide.objective-power')
-            info['mpp_x'] = slide.properties.get('openslide.mpp-x')
-            info['mpp_y'] = slide.properties.get('openslide.mpp-y')
-            info['associated_images'] = list(
-                slide.associated_images.keys())
-            info['property_count'] = len(slide.properties)
-    except Exception as e:
+        info['objective_power'] = _safe_float(
+            props.get('openslide.objective-power'))
+        info['mpp_x'] = _safe_float(props.get('openslide.mpp-x'))
+        info['mpp_y'] = _safe_float(props.get('openslide.mpp-y'))
+        info['associated_images'] = sorted(
+            _associated_names(path, mtime_ns))
+        info['property_count'] = len(props)
+    except _OPENSLIDE_ERRORS as e:
         info['error'] = str(e)
 
     return info
+
+
+# Column name -> numpy dtype for scan_many_columns(). Missing values are
+# None (object columns), NaN (float columns) or -1 (integer columns).
+SLIDE_FIELDS = {
+    'vendor': 'object',
+    'width': 'int64',
+    'height': 'int64',
+    'level_count': 'int64',
+    'mpp_x': 'float64',
+    'mpp_y': 'float64',
+    'objective_power': 'float64',
+}
+
+
+def collect(filepath: Union[str, os.PathLike],
+            fields: Sequence[str] = tuple(SLIDE_FIELDS)) -> Dict[str, Any]:
+    """Collect a flat record of the requested slide fields.
+
+    Fields are names from SLIDE_FIELDS; unavailable values are None.
+    """
+    info = get_slide_info(filepath)
+    width, height = info.get('dimensions') or (None, None)
+    record = {
+        'vendor': info.get('vendor'),
+        'width': width,
+        'height': height,
+        'level_count': info.get('level_count'),
+        'mpp_x': info.get('mpp_x'),
+        'mpp_y': info.get('mpp_y'),
+        'objective_power': info.get('objective_power'),
+    }
+    return {name: record[name] for name in fields}
+
+
+def scan_many_columns(paths: Iterable[Union[str, os.PathLike]],
+                      fields: Sequence[str] = tuple(SLIDE_FIELDS)) -> Dict[str, Any]:
+    """Collect slide fields for many files as one numpy array per field.
+
+    Returns a dict of field name -> array, all the same length and in the
+    order of *paths*, so filters like ``cols['mpp_x'] < 0.5`` run as single
+    vectorized operations. Requires numpy.
+    """
+    np = _require_numpy()
+    columns: Dict[str, list] = {name: [] for name in fields}
+    for path in paths:
+        record = collect(path, fields)
+        for name in fields:
+            columns[name].append(record[name])
+
+    arrays = {}
+    for name, values in columns.items():
+        dtype = SLIDE_FIELDS[name]
+        if dtype == 'float64':
+            values = [np.nan if v is None else v for v in values]
+        elif dtype == 'int64':
+            values = [-1 if v is None else v for v in values]
+        arrays[name] = np.array(values, dtype=dtype)
+    return arrays
+
+
+# Extensions OpenSlide can open; everything else is skipped by
+# scan_directory() without being opened.
+_SLIDE_EXTS = ('.svs', '.tif', '.tiff', '.ndpi', '.mrxs', '.scn', '.vms',
+               '.vmu', '.bif', '.svslide', '.dcm')
+
+
+def scan_directory(root: Union[str, os.PathLike], recursive: bool = False,
+                   fields: Sequence[str] = tuple(SLIDE_FIELDS),
+                   ) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """Lazily yield (path, record) for every slide file under *root*.
+
+    Files are filtered by extension straight from the directory listing,
+    so non-slide files are never opened. Records come from collect().
+    """
+    if recursive:
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if name.lower().endswith(_SLIDE_EXTS):
+                    path = Path(dirpath, name)
+                    yield path, collect(path, fields)
+        return
+
+    with os.scandir(root) as it:
+        entries = sorted((e for e in it if e.name.lower().endswith(_SLIDE_EXTS)
+                          and e.is_file()), key=lambda e: e.name)
+    for entry in entries:
+        path = Path(entry.path)
+        yield path, collect(path, fields)
+
+
+def _unavailable(func, empty):
+    """Build a stand-in for *func* that returns ``empty()`` without OpenSlide."""
+    @functools.wraps(func)
+    def stub(filepath):
+        return empty()
+    return stub
+
+
+# Without OpenSlide every helper has a constant answer, so rebind them once
+# here instead of re-checking HAS_OPENSLIDE on each call.
+if not HAS_OPENSLIDE:
+    detect_vendor = _unavailable(detect_vendor, lambda: None)
+    get_properties = _unavailable(get_properties, lambda: _EMPTY_PROPERTIES)
+    get_associated_image_names = _unavailable(get_associated_image_names, list)
+    has_label_image = _unavailable(has_label_image, bool)
+    has_macro_image = _unavailable(has_macro_image, bool)
+    get_slide_info = _unavailable(
+        get_slide_info, lambda: {'openslide_available': False})
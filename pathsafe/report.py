@@ -1,18 +1,42 @@
 """Compliance certificate generation (JSON + PDF)."""
 
+import functools
 import hashlib
 import json
+import os
+import secrets
+import time
 import uuid
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Union
 
 from fpdf import FPDF
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 import pathsafe
 from pathsafe.models import BatchResult
 
 
+def _utc_now_iso() -> str:
+    """Current UTC time in datetime.isoformat() layout, via the time module.
+
+    Matches datetime.now(timezone.utc).isoformat() (microseconds are
+    omitted when zero) without building datetime/tzinfo objects.
+    """
+    secs, ns = divmod(time.time_ns(), 1_000_000_000)
+    stamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(secs))
+    us = ns // 1000
+    if us:
+        return f'{stamp}.{us:06d}+00:00'
+    return f'{stamp}+00:00'
+
+
 def _replacement_description(finding_source: str) -> str:
     """Return a human-readable description of what the PHI was replaced with."""
     if finding_source == 'image_content':
@@ -23,16 +47,160 @@ def _replacement_description(finding_source: str) -> str:
     return 'Cleared (null bytes)'
 
 
+# Read size for the pre-3.11 hashing loop; large enough that per-call
+# overhead is amortized over many SHA-256 blocks.
+_HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _fadvise(f, advice: str) -> None:
+    """Pass a whole-file access hint to the kernel where supported."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
+
 def _sha256_file(filepath: Path) -> str:
-    """Compute SHA-256 hash of a file."""
-    h = hashlib.sha256()
+    """Compute SHA-256 hash of a file.
+
+    Uses hashlib.file_digest (Python 3.11+), which reads straight into the
+    hash object's buffer in C. hashlib's OpenSSL backend already uses the
+    CPU's SHA extensions when present.
+
+    The kernel is told the read is sequential (larger readahead) and the
+    pages are dropped afterwards. Digests are never cached: in-place
+    anonymization keeps the size and reset_timestamps zeroes the mtime, so
+    no stat-based key can tell the before and after contents apart.
+    """
     with open(filepath, 'rb') as f:
-        while True:
-            chunk = f.read(65536)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
+        _fadvise(f, 'POSIX_FADV_SEQUENTIAL')
+        if hasattr(hashlib, 'file_digest'):
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        else:
+            # Reuse one buffer instead of allocating a bytes object per chunk
+            h = hashlib.sha256()
+            buf = bytearray(_HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+            digest = h.hexdigest()
+        # Slides are read once; don't let them push hotter data out of cache
+        _fadvise(f, 'POSIX_FADV_DONTNEED')
+    return digest
+
+
+def _sha256_or_empty(filepath: Path) -> str:
+    try:
+        return _sha256_file(filepath)
+    except OSError:
+        return ''
+
+
+def sha256_files(paths: List[Path],
+                 max_workers: Optional[int] = None,
+                 progress_callback: Optional[Callable] = None,
+                 stop_check: Optional[Callable[[], bool]] = None,
+                 ) -> Dict[Path, str]:
+    """Compute SHA-256 hashes of several files concurrently.
+
+    hashlib releases the GIL while hashing, so a thread pool overlaps disk
+    reads and hashing across files. Unreadable files map to ''.
+    progress_callback(done, total, path) is called as each file finishes.
+    Once stop_check() returns True, files not yet started are skipped and
+    also map to ''.
+    """
+    if not paths:
+        return {}
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1, len(paths))
+
+    def hash_one(path):
+        if stop_check is not None and stop_check():
+            return ''
+        return _sha256_or_empty(path)
+
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(hash_one, path): path for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            hashes[path] = future.result()
+            if progress_callback is not None:
+                progress_callback(done, len(futures), path)
+    return {path: hashes[path] for path in paths}
+
+
+# Bound once at import; certificate IDs are random (version 4) UUIDs
+_rand_bits = secrets.token_bytes
+
+
+def _new_certificate_id() -> str:
+    """Return a fresh random UUID string for a certificate."""
+    return str(uuid.UUID(bytes=_rand_bits(16), version=4))
+
+
+# Write buffer for streamed JSON output
+_JSON_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+
+def write_json(data: Union[dict, list], output_path: Path) -> None:
+    """Write a dict or list as 2-space indented JSON, via orjson if installed.
+
+    With orjson, lists at the top level or one level down (e.g. the per-file
+    records) are encoded one item at a time, so only a single record is held
+    serialized in memory. The stdlib encoder already streams chunks to the
+    file; both paths write through the same large buffer, so a certificate
+    reaches the disk in a handful of write calls rather than one per 8 KiB.
+
+    The two writers do not produce identical bytes. orjson emits non-ASCII
+    text as raw UTF-8 where json escapes it (``\\u00fc``), writes NaN and
+    Infinity as ``null`` where json writes ``NaN``/``Infinity``, and spells
+    some floats differently (``1e16`` vs ``1e+16``). Compare output by
+    parsed content, not by bytes or hashes of the file.
+    """
+    if not HAS_ORJSON:
+        with open(output_path, 'w', buffering=_JSON_BUFFER_SIZE) as f:
+            json.dump(data, f, indent=2)
+        return
+
+    def dump(value, indent: bytes) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(
+            b'\n', b'\n' + indent)
+
+    with open(output_path, 'wb', buffering=_JSON_BUFFER_SIZE) as f:
+        if isinstance(data, list):
+            if not data:
+                f.write(b'[]')
+                return
+            item_sep = b'[\n  '
+            for item in data:
+                f.write(item_sep)
+                item_sep = b',\n  '
+                f.write(dump(item, b'  '))
+            f.write(b'\n]')
+            return
+        if not data:
+            f.write(b'{}')
+            return
+        sep = b'{\n  '
+        for key, value in data.items():
+            f.write(sep)
+            sep = b',\n  '
+            f.write(orjson.dumps(key) + b': ')
+            if isinstance(value, list) and value:
+                item_sep = b'[\n    '
+                for item in value:
+                    f.write(item_sep)
+                    item_sep = b',\n    '
+                    f.write(dump(item, b'    '))
+                f.write(b'\n  ]')
+            else:
+                f.write(dump(value, b'  '))
+        f.write(b'\n}')
 
 
 def generate_certificate(
@@ -46,6 +214,8 @@ def generate_certificate(
 
     Includes per-file records and a summary of all technical measures applied.
     When output_path is provided and pdf=True, a companion PDF is also generated.
+    Output checksums are taken from each result's sha256_after (computed
+    once by the anonymizer); files are never re-read here.
 
     Args:
         batch_result: The BatchResult from anonymize_batch().
@@ -62,9 +232,11 @@ def generate_certificate(
         mode = batch_result.results[0].mode
 
     # Build per-file records
+    describe = _replacement_description
     file_records = []
     verified_count = 0
     total_findings = 0
+    integrity_verified = integrity_failed = 0
     for result in batch_result.results:
         record = {
             'filename': result.output_path.name,
@@ -78,18 +250,23 @@ def generate_certificate(
 
         # Include detailed findings with replacement info
         if result.findings:
-            record['findings'] = []
-            for f in result.findings:
-                finding_rec = {
+            record['findings'] = [
+                {
                     'tag_name': f.tag_name,
                     'value_preview': f.value_preview,
                     'source': f.source,
-                    'replaced_with': _replacement_description(f.source),
+                    'replaced_with': describe(f.source),
                 }
-                record['findings'].append(finding_rec)
+                for f in result.findings
+            ]
 
-        if result.image_integrity_verified is not None:
-            record['image_integrity_verified'] = result.image_integrity_verified
+        integrity = result.image_integrity_verified
+        if integrity is not None:
+            record['image_integrity_verified'] = integrity
+            if integrity:
+                integrity_verified += 1
+            else:
+                integrity_failed += 1
 
         if result.filename_has_phi:
             record['filename_has_phi'] = True
@@ -106,11 +283,6 @@ def generate_certificate(
         file_records.append(record)
 
     # Build technical measures summary
-    integrity_verified = sum(1 for r in batch_result.results
-                             if r.image_integrity_verified is True)
-    integrity_failed = sum(1 for r in batch_result.results
-                           if r.image_integrity_verified is False)
-
     measures = []
     measures.append({
         'measure': 'Metadata tags cleared',
@@ -137,8 +309,8 @@ def generate_certificate(
 
     certificate = {
         'pathsafe_version': pathsafe.__version__,
-        'certificate_id': str(uuid.uuid4()),
-        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'certificate_id': _new_certificate_id(),
+        'generated_at': _utc_now_iso(),
         'institution': institution,
         'mode': mode,
         'summary': {
@@ -156,13 +328,17 @@ def generate_certificate(
     if output_path is not None:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(certificate, f, indent=2)
-
         if pdf:
+            # The PDF only reads the certificate, so render it on a worker
+            # thread while the JSON is written here.
             pdf_path = output_path.with_suffix('.pdf')
-            generate_pdf_certificate(certificate, pdf_path,
-                                     institution=institution)
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pdf_future = pool.submit(generate_pdf_certificate, certificate,
+                                         pdf_path, institution=institution)
+                write_json(certificate, output_path)
+                pdf_future.result()
+        else:
+            write_json(certificate, output_path)
 
     return certificate
 
@@ -171,6 +347,15 @@ def generate_certificate(
 # PDF certificate generation
 # ---------------------------------------------------------------------------
 
+_BLACK = (0, 0, 0)
+
+# Tags to hide from PDF reports (still present in JSON data)
+_PDF_HIDDEN_TAGS = frozenset({
+    'NDPI_BARCODE_TYPE',   # barcode encoding format, not PHI
+    'NDPI_SCANPROFILE',    # scanner configuration XML, not patient data
+    'ICCProfile',          # color calibration profile, rarely identifying
+})
+
 # Status colors (R, G, B)
 _STATUS_COLORS = {
     'applied': (34, 139, 34),     # forest green
@@ -181,11 +366,22 @@ _STATUS_COLORS = {
 }
 
 
+_ELLIPSIS = '...'
+
+
 def _trunc(text: str, max_len: int) -> str:
     """Truncate text with ellipsis if it exceeds max_len."""
     if len(text) <= max_len:
         return text
-    return text[:max_len - 3] + '...'
+    return text[:max_len - 3] + _ELLIPSIS
+
+
+# ASCII control characters (and DEL) -> '?'
+_PDF_CONTROL_CHARS = str.maketrans(
+    {c: '?' for c in list(range(0x20)) + [0x7F]})
+# Same, but newline passes through so it can separate batched strings
+_PDF_CONTROL_CHARS_KEEP_NL = {
+    c: r for c, r in _PDF_CONTROL_CHARS.items() if c != ord('\n')}
 
 
 def _sanitize_for_pdf(text: str) -> str:
@@ -195,7 +391,25 @@ def _sanitize_for_pdf(text: str) -> str:
     that range crash with "Character ... is outside the range of characters
     supported by the font". Replace them with '?' to prevent crashes.
     """
-    return ''.join(c if 0x20 <= ord(c) <= 0x7E else '?' for c in text)
+    # Non-ASCII -> '?' via the codec, then control characters via translate;
+    # both run in C rather than looping over characters in Python.
+    return text.encode('ascii', 'replace').decode('ascii').translate(
+        _PDF_CONTROL_CHARS)
+
+
+def _sanitize_many_for_pdf(texts: List[str]) -> List[str]:
+    """Sanitize a batch of strings with one encode/translate pass.
+
+    The strings are joined on newline, which survives sanitization, and
+    split back afterwards. If any input contains its own newline the
+    split no longer lines up, so each string is sanitized separately.
+    """
+    joined = '\n'.join(texts)
+    parts = joined.encode('ascii', 'replace').decode('ascii').translate(
+        _PDF_CONTROL_CHARS_KEEP_NL).split('\n')
+    if len(parts) != len(texts):
+        return [_sanitize_for_pdf(t) for t in texts]
+    return parts
 
 
 # Human-readable tag name mapping for reports and GUI log
@@ -226,8 +440,12 @@ _FRIENDLY_TAG_NAMES = {
 }
 
 
+@functools.lru_cache(maxsize=1024)
 def friendly_tag_name(tag_name: str) -> str:
-    """Convert internal tag names to human-readable labels for reports."""
+    """Convert internal tag names to human-readable labels for reports.
+
+    Cached: the same few dozen tag names repeat across every file in a batch.
+    """
     if tag_name in _FRIENDLY_TAG_NAMES:
         return _FRIENDLY_TAG_NAMES[tag_name]
     # Prefixed names: EXIF:Tag, GPS:Tag, NDPI_SCANNER_PROPS:Key, regex:label
@@ -265,12 +483,9 @@ def _pdf_label_value(pdf: FPDF, label: str, value: str):
 def _pdf_kv_table(pdf: FPDF, rows: list):
     """Render a 2-column key-value table with alternating row shading."""
     col_w = [65, 115]
+    pdf.set_fill_color(240, 240, 245)
     for i, (key, value) in enumerate(rows):
-        if i % 2 == 0:
-            pdf.set_fill_color(240, 240, 245)
-            fill = True
-        else:
-            fill = False
+        fill = i % 2 == 0
         pdf.set_font('Helvetica', 'B', 9)
         pdf.cell(col_w[0], 7, key, border=0, fill=fill,
                  new_x='RIGHT', new_y='TOP')
@@ -292,19 +507,16 @@ def _pdf_measures_table(pdf: FPDF, measures: list):
     pdf.cell(col_w[1], 7, 'Status', border=0, fill=True,
              new_x='LMARGIN', new_y='NEXT')
     pdf.set_text_color(0, 0, 0)
+    pdf.set_fill_color(240, 240, 245)
+    status_color = _STATUS_COLORS.get
 
     for i, m in enumerate(measures):
-        if i % 2 == 0:
-            pdf.set_fill_color(240, 240, 245)
-            fill = True
-        else:
-            fill = False
+        fill = i % 2 == 0
         pdf.set_font('Helvetica', '', 9)
         pdf.cell(col_w[0], 7, m['measure'], border=0, fill=fill,
                  new_x='RIGHT', new_y='TOP')
         status = m['status']
-        r, g, b = _STATUS_COLORS.get(status, (0, 0, 0))
-        pdf.set_text_color(r, g, b)
+        pdf.set_text_color(*status_color(status, _BLACK))
         pdf.set_font('Helvetica', 'B', 9)
         pdf.cell(col_w[1], 7, status.upper(), border=0, fill=fill,
                  new_x='LMARGIN', new_y='NEXT')
@@ -312,6 +524,15 @@ def _pdf_measures_table(pdf: FPDF, measures: list):
     pdf.ln(3)
 
 
+def _pdf_row(pdf: FPDF, col_w: list, h: float, values: list, fill: bool):
+    """Render one table row: every cell moves right, the last one wraps."""
+    last = len(values) - 1
+    for w, val in zip(col_w[:last], values[:last]):
+        pdf.cell(w, h, val, border=0, fill=fill, new_x='RIGHT', new_y='TOP')
+    pdf.cell(col_w[last], h, values[last], border=0, fill=fill,
+             new_x='LMARGIN', new_y='NEXT')
+
+
 def _pdf_file_results_table(pdf: FPDF, files: list):
     """Render the file results table (7 columns at small font)."""
     col_w = [8, 42, 18, 18, 18, 20, 66]  # total = 190
@@ -321,20 +542,14 @@ def _pdf_file_results_table(pdf: FPDF, files: list):
     pdf.set_font('Helvetica', 'B', 7)
     pdf.set_fill_color(60, 60, 80)
     pdf.set_text_color(255, 255, 255)
-    for j, hdr in enumerate(headers):
-        nx = 'RIGHT' if j < len(headers) - 1 else 'LMARGIN'
-        ny = 'TOP' if j < len(headers) - 1 else 'NEXT'
-        pdf.cell(col_w[j], 6, hdr, border=0, fill=True, new_x=nx, new_y=ny)
+    _pdf_row(pdf, col_w, 6, headers, fill=True)
     pdf.set_text_color(0, 0, 0)
+    # Fill color and font are the same for every body row
+    pdf.set_fill_color(245, 245, 248)
+    pdf.set_font('Helvetica', '', 7)
 
     for i, frec in enumerate(files):
-        if i % 2 == 0:
-            pdf.set_fill_color(245, 245, 248)
-            fill = True
-        else:
-            fill = False
-
-        pdf.set_font('Helvetica', '', 7)
+        fill = i % 2 == 0
 
         integrity = frec.get('image_integrity_verified')
         if integrity is True:
@@ -344,22 +559,24 @@ def _pdf_file_results_table(pdf: FPDF, files: list):
         else:
             integrity_str = '-'
 
+        # Truncation is inlined (see _trunc) to skip a call per cell
+        name = frec.get('filename', '')
+        if len(name) > 28:
+            name = name[:25] + _ELLIPSIS
         sha = frec.get('sha256_after', frec.get('error', '-'))
+        if len(sha) > 40:
+            sha = sha[:37] + _ELLIPSIS
         row_vals = [
             str(i + 1),
-            _trunc(frec.get('filename', ''), 28),
+            name,
             frec.get('format', '?'),
             str(frec.get('findings_cleared', 0)),
              'YES' if frec.get('verified_clean') else 'NO',
             integrity_str,
-            _trunc(sha, 40),
+            sha,
         ]
 
-        for j, val in enumerate(row_vals):
-            nx = 'RIGHT' if j < len(row_vals) - 1 else 'LMARGIN'
-            ny = 'TOP' if j < len(row_vals) - 1 else 'NEXT'
-            pdf.cell(col_w[j], 5.5, val, border=0, fill=fill,
-                     new_x=nx, new_y=ny)
+        _pdf_row(pdf, col_w, 5.5, row_vals, fill=fill)
     pdf.ln(3)
 
 
@@ -439,12 +656,28 @@ def generate_pdf_certificate(certificate: dict, output_path: Path,
         pdf.cell(0, 7, 'File Results', new_x='LMARGIN', new_y='NEXT')
         _pdf_file_results_table(pdf, files)
 
+        # Group files for the sections below in a single pass
+        files_with_findings = []
+        phi_files = []
+        error_files = []
+        for f in files:
+            if f.get('findings'):
+                files_with_findings.append(f)
+            if f.get('filename_has_phi'):
+                phi_files.append(f)
+            if f.get('error'):
+                error_files.append(f)
+
         # Detailed findings per file (what was found, what it was replaced with)
-        files_with_findings = [f for f in files if f.get('findings')]
         if files_with_findings:
             pdf.set_font('Helvetica', 'B', 11)
             pdf.cell(0, 7, 'Detailed Findings', new_x='LMARGIN', new_y='NEXT')
             pdf.ln(1)
+            hidden = _PDF_HIDDEN_TAGS
+            tag_x = pdf.l_margin + 5
+            replaced_x = pdf.l_margin + 55
+            # Few distinct tags recur across files: sanitize each name once
+            tag_labels = {}
 
             for frec in files_with_findings:
                 pdf.set_font('Helvetica', 'B', 9)
@@ -453,23 +686,31 @@ def generate_pdf_certificate(certificate: dict, output_path: Path,
                          new_x='LMARGIN', new_y='NEXT')
                 pdf.set_text_color(0, 0, 0)
 
-                for finding in frec['findings']:
-                    raw_tag = finding.get('tag_name', '?')
-                    if raw_tag in _PDF_HIDDEN_TAGS:
-                        continue
+                visible = [f for f in frec['findings']
+                           if f.get('tag_name', '?') not in hidden]
+                previews = _sanitize_many_for_pdf(
+                    [_trunc(f.get('value_preview', ''), 55) for f in visible])
+                # Each finding is a 5 mm line plus a 4 mm line; track y
+                # locally instead of asking fpdf for it every row.
+                y = pdf.get_y()
 
-                    tag = _sanitize_for_pdf(friendly_tag_name(raw_tag))
-                    preview = _sanitize_for_pdf(
-                        _trunc(finding.get('value_preview', ''), 55))
+                for finding, preview in zip(visible, previews):
+                    raw_tag = finding.get('tag_name', '?')
+                    tag = tag_labels.get(raw_tag)
+                    if tag is None:
+                        tag = tag_labels[raw_tag] = _sanitize_for_pdf(
+                            friendly_tag_name(raw_tag))
                     replacement = finding.get('replaced_with', 'Cleared')
 
                     # Check for page break
-                    if pdf.get_y() > 260:
+                    if y > 260:
                         pdf.add_page()
+                        y = pdf.get_y()
+                    y += 9
 
-                    # Tag name (bold) + value preview
-                    pdf.set_font('Helvetica', '', 8)
-                    pdf.cell(5, 5, '', new_x='RIGHT', new_y='TOP')
+                    # Tag name (bold) + value preview; indents are set_x
+                    # moves rather than empty cells
+                    pdf.set_x(tag_x)
                     pdf.set_font('Helvetica', 'B', 8)
                     pdf.cell(50, 5, tag, new_x='RIGHT', new_y='TOP')
                     pdf.set_font('Helvetica', '', 8)
@@ -478,7 +719,7 @@ def generate_pdf_certificate(certificate: dict, output_path: Path,
                     # Replacement line (indented, gray)
                     pdf.set_text_color(100, 100, 100)
                     pdf.set_font('Helvetica', 'I', 7)
-                    pdf.cell(55, 4, '', new_x='RIGHT', new_y='TOP')
+                    pdf.set_x(replaced_x)
                     pdf.cell(0, 4, f'Replaced with: {replacement}',
                              new_x='LMARGIN', new_y='NEXT')
                     pdf.set_text_color(0, 0, 0)
@@ -486,7 +727,6 @@ def generate_pdf_certificate(certificate: dict, output_path: Path,
                 pdf.ln(2)
 
         # Filename PHI warnings
-        phi_files = [f for f in files if f.get('filename_has_phi')]
         if phi_files:
             pdf.set_font('Helvetica', 'B', 9)
             pdf.set_text_color(192, 48, 48)
@@ -500,7 +740,6 @@ def generate_pdf_certificate(certificate: dict, output_path: Path,
             pdf.ln(2)
 
         # Error files
-        error_files = [f for f in files if f.get('error')]
         if error_files:
             pdf.set_font('Helvetica', 'B', 9)
             pdf.set_text_color(192, 48, 48)
@@ -545,8 +784,12 @@ _SCAN_STATUS_COLORS = {
 }
 
 
-def _pdf_scan_file_table(pdf: FPDF, results: list):
-    """Render the file results table for a scan report (5 columns)."""
+def _pdf_scan_file_table(pdf: FPDF, results: list) -> list:
+    """Render the file results table for a scan report (5 columns).
+
+    Returns (entry, visible_findings) pairs for the PHI rows that have
+    findings, so the Detailed Findings section reuses this pass.
+    """
     col_w = [8, 42, 20, 18, 102]  # total = 190
     headers = ['#', 'Filename', 'Status', 'Findings', 'SHA-256 (before)']
 
@@ -554,18 +797,16 @@ def _pdf_scan_file_table(pdf: FPDF, results: list):
     pdf.set_font('Helvetica', 'B', 7)
     pdf.set_fill_color(60, 60, 80)
     pdf.set_text_color(255, 255, 255)
-    for j, hdr in enumerate(headers):
-        nx = 'RIGHT' if j < len(headers) - 1 else 'LMARGIN'
-        ny = 'TOP' if j < len(headers) - 1 else 'NEXT'
-        pdf.cell(col_w[j], 6, hdr, border=0, fill=True, new_x=nx, new_y=ny)
+    _pdf_row(pdf, col_w, 6, headers, fill=True)
     pdf.set_text_color(0, 0, 0)
+    pdf.set_fill_color(245, 245, 248)
+    pdf.set_font('Helvetica', '', 7)
+    scan_colors = _SCAN_STATUS_COLORS  # status is always one of its keys
+    hidden = _PDF_HIDDEN_TAGS
+    phi_rows = []
 
     for i, entry in enumerate(results):
-        if i % 2 == 0:
-            pdf.set_fill_color(245, 245, 248)
-            fill = True
-        else:
-            fill = False
+        fill = i % 2 == 0
 
         filepath = Path(entry.get('filepath', ''))
         error = entry.get('error')
@@ -582,19 +823,22 @@ def _pdf_scan_file_table(pdf: FPDF, results: list):
         else:
             status = 'PHI FOUND'
             visible = [f for f in findings
-                       if f.get('tag_name', '') not in _PDF_HIDDEN_TAGS]
+                       if f.get('tag_name', '?') not in hidden]
             findings_str = f'{len(visible)} finding(s)'
+            if findings:
+                phi_rows.append((entry, visible))
 
-        # Row number
-        pdf.set_font('Helvetica', '', 7)
+        # Row number (each row ends in the regular 7pt font)
         pdf.cell(col_w[0], 5.5, str(i + 1), border=0, fill=fill,
                  new_x='RIGHT', new_y='TOP')
-        # Filename
-        pdf.cell(col_w[1], 5.5, _trunc(filepath.name, 28), border=0, fill=fill,
+        # Filename (truncation inlined, see _trunc)
+        name = filepath.name
+        if len(name) > 28:
+            name = name[:25] + _ELLIPSIS
+        pdf.cell(col_w[1], 5.5, name, border=0, fill=fill,
                  new_x='RIGHT', new_y='TOP')
         # Status (color-coded)
-        r, g, b = _SCAN_STATUS_COLORS.get(status, (0, 0, 0))
-        pdf.set_text_color(r, g, b)
+        pdf.set_text_color(*scan_colors[status])
         pdf.set_font('Helvetica', 'B', 7)
         pdf.cell(col_w[2], 5.5, status, border=0, fill=fill,
                  new_x='RIGHT', new_y='TOP')
@@ -607,6 +851,7 @@ def _pdf_scan_file_table(pdf: FPDF, results: list):
         pdf.cell(col_w[4], 5.5, sha256 or '-', border=0, fill=fill,
                  new_x='LMARGIN', new_y='NEXT')
     pdf.ln(3)
+    return phi_rows
 
 
 # Legend entries: (friendly name, description)
@@ -674,12 +919,9 @@ def _pdf_legend(pdf: FPDF, used_tags: set = None):
     pdf.set_text_color(0, 0, 0)
     pdf.ln(2)
 
+    pdf.set_fill_color(240, 240, 245)
     for i, (name, description) in enumerate(_LEGEND_ENTRIES):
-        if i % 2 == 0:
-            pdf.set_fill_color(240, 240, 245)
-            fill = True
-        else:
-            fill = False
+        fill = i % 2 == 0
 
         # Name column (bold)
         pdf.set_font('Helvetica', 'B', 8)
@@ -696,14 +938,6 @@ def _pdf_legend(pdf: FPDF, used_tags: set = None):
     pdf.ln(3)
 
 
-# Tags to hide from PDF reports (still present in JSON data)
-_PDF_HIDDEN_TAGS = {
-    'NDPI_BARCODE_TYPE',   # barcode encoding format, not PHI
-    'NDPI_SCANPROFILE',    # scanner configuration XML, not patient data
-    'ICCProfile',          # color calibration profile, rarely identifying
-}
-
-
 def generate_scan_report(scan_data: dict, output_path: Path,
                          institution: str = "") -> Path:
     """Generate a PDF report of a pre-anonymization PHI scan.
@@ -735,7 +969,7 @@ def generate_scan_report(scan_data: dict, output_path: Path,
     pdf.set_font('Helvetica', '', 9)
     pdf.set_text_color(120, 120, 120)
     pdf.cell(0, 5, f'PathSafe v{pathsafe.__version__}  |  '
-             f'{datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")}',
+             f'{time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())}',
              new_x='LMARGIN', new_y='NEXT')
     pdf.set_text_color(0, 0, 0)
     pdf.line(10, pdf.get_y() + 1, 200, pdf.get_y() + 1)
@@ -760,23 +994,22 @@ def generate_scan_report(scan_data: dict, output_path: Path,
 
     # --- File results table ---
     results = scan_data.get('results', [])
+    phi_results = []
     if results:
         pdf.set_font('Helvetica', 'B', 11)
         pdf.cell(0, 7, 'File Results', new_x='LMARGIN', new_y='NEXT')
-        _pdf_scan_file_table(pdf, results)
+        phi_results = _pdf_scan_file_table(pdf, results)
 
     # --- Detailed findings ---
-    phi_results = [r for r in results
-                   if not r.get('is_clean') and not r.get('error')
-                   and r.get('findings')]
     if phi_results:
         pdf.set_font('Helvetica', 'B', 11)
         pdf.cell(0, 7, 'Detailed Findings', new_x='LMARGIN', new_y='NEXT')
         pdf.ln(1)
+        tag_x = pdf.l_margin + 5
+        tag_labels = {}
 
-        for entry in phi_results:
+        for entry, visible in phi_results:
             filepath = Path(entry['filepath'])
-            findings = entry['findings']
 
             pdf.set_font('Helvetica', 'B', 9)
             pdf.set_text_color(200, 130, 0)
@@ -784,14 +1017,16 @@ def generate_scan_report(scan_data: dict, output_path: Path,
                      new_x='LMARGIN', new_y='NEXT')
             pdf.set_text_color(0, 0, 0)
 
-            for f in findings:
-                raw_tag = f.get('tag_name', '?')
-                if raw_tag in _PDF_HIDDEN_TAGS:
-                    continue
-                pdf.set_font('Helvetica', '', 8)
-                tag = _sanitize_for_pdf(friendly_tag_name(raw_tag))
-                preview = _sanitize_for_pdf(_trunc(f.get('value_preview', ''), 70))
-                pdf.cell(5, 5, '', new_x='RIGHT', new_y='TOP')
+            previews = _sanitize_many_for_pdf(
+                [_trunc(f.get('value_preview', ''), 70) for f in visible])
+
+            for finding, preview in zip(visible, previews):
+                raw_tag = finding.get('tag_name', '?')
+                tag = tag_labels.get(raw_tag)
+                if tag is None:
+                    tag = tag_labels[raw_tag] = _sanitize_for_pdf(
+                        friendly_tag_name(raw_tag))
+                pdf.set_x(tag_x)
                 pdf.set_font('Helvetica', 'B', 8)
                 pdf.cell(50, 5, tag, new_x='RIGHT', new_y='TOP')
                 pdf.set_font('Helvetica', '', 8)
@@ -818,11 +1053,13 @@ def generate_scan_report(scan_data: dict, output_path: Path,
     return output_path
 
 
+_FORMAT_BY_EXT = {
+    '.ndpi': 'ndpi', '.svs': 'svs', '.tif': 'tiff', '.tiff': 'tiff',
+    '.mrxs': 'mrxs', '.bif': 'bif', '.scn': 'scn',
+    '.dcm': 'dicom', '.dicom': 'dicom',
+}
+
+
 def _detect_format_from_ext(filepath: Path) -> str:
     """Simple format detection from extension for certificate records."""
-    ext = filepath.suffix.lower()
-    return {
-        '.ndpi': 'ndpi', '.svs': 'svs', '.tif': 'tiff', '.tiff': 'tiff',
-        '.mrxs': 'mrxs', '.bif': 'bif', '.scn': 'scn',
-        '.dcm': 'dicom', '.dicom': 'dicom',
-    }.get(ext, 'unknown')
+    return _FORMAT_BY_EXT.get(filepath.suffix.lower(), 'unknown')
@@ -14,10 +14,12 @@ from pathsafe.tiff.parser import (  # noqa: F401
     TIFFHeader,
     read_header,
     read_ifd,
+    read_ifd_link,
     read_tag_value_bytes,
     read_tag_string,
     read_tag_numeric,
     find_tag_in_ifd,
+    find_image_data_entries,
     find_tag_in_first_ifd,
     iter_ifds,
     get_all_string_tags,
@@ -41,6 +43,7 @@ from pathsafe.tiff.blanking import (  # noqa: F401
 # --- hashing.py: image integrity hashing ---
 from pathsafe.tiff.hashing import (  # noqa: F401
     compute_ifd_tile_hash,
+    INTEGRITY_HASHES,
     compute_image_hashes,
 )
 
@@ -1,7 +1,6 @@
 """TIFF image data blanking and extra metadata handling."""
 
 import logging
-import struct
 from typing import BinaryIO, List, Tuple
 
 logger = logging.getLogger(__name__)
@@ -9,7 +8,11 @@ logger = logging.getLogger(__name__)
 from pathsafe.tiff.parser import (
     IFDEntry,
     TIFFHeader,
+    find_image_data_entries,
+    _UINT32,
+    _UINT64,
     read_ifd,
+    read_ifd_link,
     read_tag_long_array,
     read_tag_numeric,
     read_tag_value_bytes,
@@ -63,6 +66,19 @@ EXTRA_METADATA_TAGS = {
 }
 
 
+# Shared read-only zeros; padding is written as slices of this, so blanking
+# allocates nothing per tile however many tiles or sizes an IFD has.
+_ZERO_CHUNK = memoryview(bytes(1 << 20))
+
+
+def _write_zeros(f: BinaryIO, n: int) -> None:
+    """Write n zero bytes at the current position, 1 MB at a time."""
+    while n > 0:
+        k = min(n, len(_ZERO_CHUNK))
+        f.write(_ZERO_CHUNK[:k])
+        n -= k
+
+
 def blank_ifd_image_data(f: BinaryIO, header: TIFFHeader,
                          entries: List[IFDEntry]) -> int:
     """Overwrite all image strip/tile data in an IFD with blank bytes.
@@ -71,21 +87,7 @@ def blank_ifd_image_data(f: BinaryIO, header: TIFFHeader,
     strip/tile, preserving TIFF structure while destroying pixel content.
     Returns total bytes blanked.
     """
-    offset_entry = None
-    count_entry = None
-
-    for entry in entries:
-        if entry.tag_id == 273:    # StripOffsets
-            offset_entry = entry
-        elif entry.tag_id == 279:  # StripByteCounts
-            count_entry = entry
-        elif entry.tag_id == 324:  # TileOffsets
-            if offset_entry is None:
-                offset_entry = entry
-        elif entry.tag_id == 325:  # TileByteCounts
-            if count_entry is None:
-                count_entry = entry
-
+    offset_entry, count_entry = find_image_data_entries(entries)
     if offset_entry is None or count_entry is None:
         return 0
 
@@ -96,14 +98,19 @@ def blank_ifd_image_data(f: BinaryIO, header: TIFFHeader,
         return 0
 
     total_blanked = 0
+    pos = -1    # file position after the last write
     for off, cnt in zip(offsets, counts):
         if cnt > 0:
-            f.seek(off)
+            # Writers lay tiles out back to back, so a run of contiguous
+            # tiles becomes sequential writes with no seek in between
+            if off != pos:
+                f.seek(off)
+            pos = off + cnt
             if cnt >= len(_BLANK_JPEG):
                 f.write(_BLANK_JPEG)
-                f.write(b'\x00' * (cnt - len(_BLANK_JPEG)))
+                _write_zeros(f, cnt - len(_BLANK_JPEG))
             else:
-                f.write(b'\x00' * cnt)
+                _write_zeros(f, cnt)
             total_blanked += cnt
 
     return total_blanked
@@ -137,10 +144,10 @@ def unlink_ifd(f: BinaryIO, header: TIFFHeader,
     if header.first_ifd_offset == target_ifd_offset:
         if header.is_bigtiff:
             f.seek(8)
-            f.write(struct.pack(endian + 'Q', target_next))
+            f.write(_UINT64[endian].pack(target_next))
         else:
             f.seek(4)
-            f.write(struct.pack(endian + 'I', target_next))
+            f.write(_UINT32[endian].pack(target_next))
         header.first_ifd_offset = target_next
         return True
 
@@ -153,19 +160,19 @@ def unlink_ifd(f: BinaryIO, header: TIFFHeader,
             break  # Circular chain protection
         seen.add(pred_offset)
 
-        pred_entries, pred_next = read_ifd(f, header, pred_offset)
+        # Only the entry count and next pointer are needed here
+        num_entries, pred_next = read_ifd_link(f, header, pred_offset)
 
         if pred_next == target_ifd_offset:
             # Found the predecessor -- rewrite its next-pointer
-            num_entries = len(pred_entries)
             if header.is_bigtiff:
                 next_ptr_offset = pred_offset + 8 + (num_entries * 20)
                 f.seek(next_ptr_offset)
-                f.write(struct.pack(endian + 'Q', target_next))
+                f.write(_UINT64[endian].pack(target_next))
             else:
                 next_ptr_offset = pred_offset + 2 + (num_entries * 12)
                 f.seek(next_ptr_offset)
-                f.write(struct.pack(endian + 'I', target_next))
+                f.write(_UINT32[endian].pack(target_next))
             return True
 
         pred_offset = pred_next
@@ -199,20 +206,7 @@ def is_ifd_image_blanked(f: BinaryIO, header: TIFFHeader,
     Detects both current format (630-byte minimal JPEG + zeros) and
     legacy format (4-byte SOI+EOI + zeros) written by older versions.
     """
-    offset_entry = None
-    count_entry = None
-    for entry in entries:
-        if entry.tag_id == 273:    # StripOffsets
-            offset_entry = entry
-        elif entry.tag_id == 279:  # StripByteCounts
-            count_entry = entry
-        elif entry.tag_id == 324:  # TileOffsets
-            if offset_entry is None:
-                offset_entry = entry
-        elif entry.tag_id == 325:  # TileByteCounts
-            if count_entry is None:
-                count_entry = entry
-
+    offset_entry, count_entry = find_image_data_entries(entries)
     if offset_entry is None or count_entry is None:
         return False
 
@@ -261,14 +255,7 @@ def get_ifd_image_data_size(header: TIFFHeader,
                             entries: List[IFDEntry],
                             f: BinaryIO) -> int:
     """Get total size of image data (strips or tiles) in an IFD."""
-    count_entry = None
-    for entry in entries:
-        if entry.tag_id == 279:    # StripByteCounts
-            count_entry = entry
-            break
-        elif entry.tag_id == 325:  # TileByteCounts
-            count_entry = entry
-
+    _, count_entry = find_image_data_entries(entries)
     if count_entry is None:
         return 0
 
@@ -287,24 +274,27 @@ def scan_extra_metadata_tags(f: BinaryIO, header: TIFFHeader,
     Returns list of (entry, value_preview) for tags that have non-empty content.
     Used by NDPI, SVS, and generic TIFF handlers as an extra safety check.
     """
-    if exclude_tags is None:
-        exclude_tags = set()
+    # One membership test per entry; built per call so changes to
+    # EXTRA_METADATA_TAGS are still honoured
+    if exclude_tags:
+        wanted = EXTRA_METADATA_TAGS.keys() - exclude_tags
+    else:
+        wanted = EXTRA_METADATA_TAGS
     findings = []
     for entry in entries:
-        if entry.tag_id not in EXTRA_METADATA_TAGS or entry.tag_id in exclude_tags:
+        if entry.tag_id not in wanted:
             continue
         # Only check string (ASCII) or undefined (EXIF) types
         if entry.dtype not in (2, 7):
             continue
         raw = read_tag_value_bytes(f, entry)
-        if not raw or raw == b'\x00' * len(raw):
-            continue
-        # Check if already anonymized (all X's + null)
+        # Skip empty/zeroed values and ones already anonymized (all X's + null)
         stripped = raw.rstrip(b'\x00')
-        if stripped and all(b == ord('X') for b in stripped):
+        if not stripped or stripped.count(b'X') == len(stripped):
             continue
         # For XMP (tag 700), check if it's an XML blob with potentially identifying content
-        value = stripped.decode('utf-8', errors='replace')[:200]
+        # 200 characters never take more than 800 UTF-8 bytes
+        value = stripped[:800].decode('utf-8', errors='replace')[:200]
         if value.strip():
             findings.append((entry, value))
     return findings
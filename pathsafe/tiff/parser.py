@@ -6,8 +6,11 @@ with little-endian (II) and big-endian (MM) byte orders.
 Ported from proven production code that successfully processed 3,101+ NDPI files.
 """
 
+import array
+import functools
 import logging
 import struct
+import sys
 from typing import BinaryIO, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,33 @@ TIFF_TYPES: Dict[int, Tuple[int, str]] = {
     17: (8, 'q'),   # SLONG8 (BigTIFF, signed)
 }
 
+# Precompiled structs for the fixed-layout fields, keyed by endian ('<'/'>').
+# Struct objects skip the format-string lookup that struct.unpack does on
+# every call, which adds up across IFD chains of many entries.
+_UINT16 = {e: struct.Struct(e + 'H') for e in '<>'}
+_UINT32 = {e: struct.Struct(e + 'I') for e in '<>'}
+_UINT64 = {e: struct.Struct(e + 'Q') for e in '<>'}
+# BigTIFF header tail: bytesize, reserved, first IFD offset
+_BIGTIFF_HEADER = {e: struct.Struct(e + 'HHQ') for e in '<>'}
+# Whole IFD entries: tag, type, count, value/offset field
+_TIFF_ENTRY = {e: struct.Struct(e + 'HHII') for e in '<>'}
+_BIGTIFF_ENTRY = {e: struct.Struct(e + 'HHQQ') for e in '<>'}
+
+
+# array typecodes whose native item size matches the TIFF standard size, so
+# long tag arrays can be decoded with array.frombytes (+ byteswap)
+_ARRAY_CODES = frozenset(
+    code for code in 'BbHhIiQqfd'
+    if array.array(code).itemsize == struct.calcsize('<' + code))
+_NATIVE_ENDIAN = '<' if sys.byteorder == 'little' else '>'
+
+
+@functools.lru_cache(maxsize=256)
+def _struct(fmt: str) -> struct.Struct:
+    """Return a cached Struct for a variable-length tag value format."""
+    return struct.Struct(fmt)
+
+
 # Well-known TIFF tag names
 TAG_NAMES: Dict[int, str] = {
     254: 'NewSubfileType', 256: 'ImageWidth', 257: 'ImageLength',
@@ -99,7 +129,9 @@ class TIFFHeader:
 def read_header(f: BinaryIO) -> Optional[TIFFHeader]:
     """Read and validate TIFF/BigTIFF header. Returns None if not a valid TIFF."""
     f.seek(0)
-    bo = f.read(2)
+    # One read covers both layouts: TIFF is 8 bytes, BigTIFF 16
+    buf = f.read(16)
+    bo = buf[:2]
     if bo == b'II':
         endian = '<'
     elif bo == b'MM':
@@ -107,101 +139,119 @@ def read_header(f: BinaryIO) -> Optional[TIFFHeader]:
     else:
         return None
 
-    magic = struct.unpack(endian + 'H', f.read(2))[0]
+    if len(buf) < 8:
+        return None
+    magic = _UINT16[endian].unpack_from(buf, 2)[0]
 
     if magic == 42:
         # Standard TIFF
-        ifd_offset = struct.unpack(endian + 'I', f.read(4))[0]
+        ifd_offset = _UINT32[endian].unpack_from(buf, 4)[0]
         return TIFFHeader(endian, False, ifd_offset)
     elif magic == 43:
-        # BigTIFF
-        bytesize = struct.unpack(endian + 'H', f.read(2))[0]
+        # BigTIFF: bytesize (must be 8), reserved, first IFD offset
+        if len(buf) < 16:
+            return None
+        bytesize, _reserved, ifd_offset = _BIGTIFF_HEADER[endian].unpack_from(buf, 4)
         if bytesize != 8:
             return None
-        _reserved = f.read(2)
-        ifd_offset = struct.unpack(endian + 'Q', f.read(8))[0]
         return TIFFHeader(endian, True, ifd_offset)
     else:
         return None
 
 
-def read_ifd(f: BinaryIO, header: TIFFHeader,
-             ifd_offset: int) -> Tuple[List[IFDEntry], int]:
-    """Read all entries from an IFD. Returns (entries, next_ifd_offset)."""
-    endian = header.endian
+# Maximum plausible tag count per IFD.  Real WSI IFDs have <200 tags;
+# anything vastly beyond that indicates the IFD pointer landed in image
+# data and the "tag count" is garbage bytes.
+MAX_IFD_ENTRIES = 1000
+
+
+def _read_entry_count(f: BinaryIO, header: TIFFHeader,
+                      ifd_offset: int) -> Optional[int]:
+    """Seek to an IFD and read its entry count.
+
+    Leaves f positioned at the first entry. Returns None if the count is
+    missing (EOF) or implausibly large (corrupt IFD pointer).
+    """
+    count_field = _UINT64[header.endian] if header.is_bigtiff else _UINT16[header.endian]
     f.seek(ifd_offset)
+    data = f.read(count_field.size)
+    if len(data) < count_field.size:
+        return None
+    num_entries = count_field.unpack(data)[0]
+    if num_entries > MAX_IFD_ENTRIES:
+        logger.debug("IFD at offset %d has %d entries (> %d), likely corrupt",
+                     ifd_offset, num_entries, MAX_IFD_ENTRIES)
+        return None
+    return num_entries
 
-    # Maximum plausible tag count per IFD.  Real WSI IFDs have <200 tags;
-    # anything vastly beyond that indicates the IFD pointer landed in image
-    # data and the "tag count" is garbage bytes.
-    MAX_IFD_ENTRIES = 1000
 
+def read_ifd(f: BinaryIO, header: TIFFHeader,
+             ifd_offset: int) -> Tuple[List[IFDEntry], int]:
+    """Read all entries from an IFD. Returns (entries, next_ifd_offset)."""
+    num_entries = _read_entry_count(f, header, ifd_offset)
+    if num_entries is None:
+        return [], 0
     if header.is_bigtiff:
-        data = f.read(8)
-        if len(data) < 8:
-            return [], 0
-        num_entries = struct.unpack(endian + 'Q', data)[0]
-        if num_entries > MAX_IFD_ENTRIES:
-            logger.debug("IFD at offset %d has %d entries (> %d), likely corrupt",
-                         ifd_offset, num_entries, MAX_IFD_ENTRIES)
-            return [], 0
-        entry_size = 20
-        inline_threshold = 8
+        entry_struct = _BIGTIFF_ENTRY[header.endian]
+        offset_field = _UINT64[header.endian]
     else:
-        data = f.read(2)
-        if len(data) < 2:
-            return [], 0
-        num_entries = struct.unpack(endian + 'H', data)[0]
-        if num_entries > MAX_IFD_ENTRIES:
-            logger.debug("IFD at offset %d has %d entries (> %d), likely corrupt",
-                         ifd_offset, num_entries, MAX_IFD_ENTRIES)
-            return [], 0
-        entry_size = 12
-        inline_threshold = 4
+        entry_struct = _TIFF_ENTRY[header.endian]
+        offset_field = _UINT32[header.endian]
+
+    # Read every entry plus the next-IFD pointer in one call, then decode
+    # the entries in place rather than issuing a read per entry.
+    entry_size = entry_struct.size
+    inline_threshold = offset_field.size
+    first_entry = f.tell()
+    table_size = num_entries * entry_size
+    buf = f.read(table_size + offset_field.size)
+    complete = min(len(buf) // entry_size, num_entries)
 
     entries = []
-    for e in range(num_entries):
-        entry_offset = f.tell()
-        data = f.read(entry_size)
-        if len(data) < entry_size:
-            break
-
-        if header.is_bigtiff:
-            tag_id, dtype = struct.unpack(endian + 'HH', data[:4])
-            count = struct.unpack(endian + 'Q', data[4:12])[0]
-            elem_size = TIFF_TYPES.get(dtype, (1, 'B'))[0]
-            total = elem_size * count
-            if total <= 8:
-                value_offset = entry_offset + 12
-                is_inline = True
-            else:
-                value_offset = struct.unpack(endian + 'Q', data[12:20])[0]
-                is_inline = False
+    entry_offset = first_entry
+    for tag_id, dtype, count, value_field in entry_struct.iter_unpack(
+            memoryview(buf)[:complete * entry_size]):
+        elem_size = TIFF_TYPES.get(dtype, (1, 'B'))[0]
+        total = elem_size * count
+        if total <= inline_threshold:
+            value_offset = entry_offset + entry_size - inline_threshold
+            is_inline = True
         else:
-            tag_id, dtype, count = struct.unpack(endian + 'HHI', data[:8])
-            elem_size = TIFF_TYPES.get(dtype, (1, 'B'))[0]
-            total = elem_size * count
-            if total <= 4:
-                value_offset = entry_offset + 8
-                is_inline = True
-            else:
-                value_offset = struct.unpack(endian + 'I', data[8:12])[0]
-                is_inline = False
+            value_offset = value_field
+            is_inline = False
 
         entries.append(IFDEntry(tag_id, dtype, count, value_offset,
                                 entry_offset, is_inline))
+        entry_offset += entry_size
 
-    # Read next IFD offset
-    if header.is_bigtiff:
-        next_data = f.read(8)
-        next_offset = struct.unpack(endian + 'Q', next_data)[0] if len(next_data) == 8 else 0
+    # Next IFD offset follows the entry table; 0 if the IFD is truncated
+    if len(buf) == table_size + offset_field.size:
+        next_offset = offset_field.unpack_from(buf, table_size)[0]
     else:
-        next_data = f.read(4)
-        next_offset = struct.unpack(endian + 'I', next_data)[0] if len(next_data) == 4 else 0
+        next_offset = 0
 
     return entries, next_offset
 
 
+def read_ifd_link(f: BinaryIO, header: TIFFHeader,
+                  ifd_offset: int) -> Tuple[int, int]:
+    """Read an IFD's entry count and next-IFD offset without decoding entries.
+
+    Returns (num_entries, next_ifd_offset); (0, 0) where read_ifd would
+    find no entries, and next_ifd_offset 0 if the IFD is truncated.
+    """
+    num_entries = _read_entry_count(f, header, ifd_offset)
+    if num_entries is None:
+        return 0, 0
+    offset_field = _UINT64[header.endian] if header.is_bigtiff else _UINT32[header.endian]
+    entry_size = 20 if header.is_bigtiff else 12
+    f.seek(num_entries * entry_size, 1)
+    data = f.read(offset_field.size)
+    if len(data) < offset_field.size:
+        return num_entries, 0
+    return num_entries, offset_field.unpack(data)[0]
+
+
 def read_tag_value_bytes(f: BinaryIO, entry: IFDEntry) -> bytes:
     """Read the raw bytes of a tag value."""
     f.seek(entry.value_offset)
@@ -223,17 +273,17 @@ def read_tag_numeric(f: BinaryIO, header: TIFFHeader,
     f.seek(entry.value_offset)
 
     if entry.count == 1 and fmt_char not in ('s',):
-        fmt = header.endian + fmt_char
-        data = f.read(struct.calcsize(fmt))
-        if len(data) < struct.calcsize(fmt):
+        st = _struct(header.endian + fmt_char)
+        data = f.read(st.size)
+        if len(data) < st.size:
             return None
-        return struct.unpack(fmt, data)[0]
+        return st.unpack(data)[0]
     elif entry.count <= 10 and fmt_char not in ('s',):
-        fmt = header.endian + fmt_char * entry.count
-        data = f.read(struct.calcsize(fmt))
-        if len(data) < struct.calcsize(fmt):
+        st = _struct(header.endian + fmt_char * entry.count)
+        data = f.read(st.size)
+        if len(data) < st.size:
             return None
-        return list(struct.unpack(fmt, data))
+        return list(st.unpack(data))
     else:
         return None
 
@@ -248,6 +298,19 @@ def find_tag_in_ifd(f: BinaryIO, header: TIFFHeader,
     return None
 
 
+def find_image_data_entries(
+        entries: List[IFDEntry]) -> Tuple[Optional[IFDEntry], Optional[IFDEntry]]:
+    """Find an IFD's image data offset and byte-count entries.
+
+    Strips (273/279) take precedence over tiles (324/325), per field.
+    Returns (offsets_entry, byte_counts_entry); either may be None.
+    """
+    by_tag = {entry.tag_id: entry for entry in entries}
+    offset_entry = by_tag.get(273) or by_tag.get(324)  # StripOffsets / TileOffsets
+    count_entry = by_tag.get(279) or by_tag.get(325)   # StripByteCounts / TileByteCounts
+    return offset_entry, count_entry
+
+
 def find_tag_in_first_ifd(filepath: str,
                           target_tag: int) -> Tuple[Optional[int], Optional[int]]:
     """Find a tag's value offset and byte count from the FIRST IFD.
@@ -313,9 +376,18 @@ def read_tag_long_array(f: BinaryIO, header: TIFFHeader,
     if fmt_char in ('s',):
         return []
     f.seek(entry.value_offset)
-    fmt = header.endian + fmt_char * entry.count
-    size = struct.calcsize(fmt)
+    size = elem_size * entry.count
     data = f.read(size)
     if len(data) < size:
         return []
-    return list(struct.unpack(fmt, data))
+    # RATIONAL's 'II' decodes as 2 * count 'I' fields
+    code = fmt_char[0]
+    if code in _ARRAY_CODES:
+        # Tile offset arrays run to tens of thousands of entries;
+        # array.tolist() boxes them faster than list(struct.unpack())
+        values = array.array(code, data)
+        if header.endian != _NATIVE_ENDIAN:
+            values.byteswap()
+        return values.tolist()
+    st = _struct(f'{header.endian}{entry.count * len(fmt_char)}{code}')
+    return list(st.unpack(data))
@@ -96,12 +96,11 @@ def scan_exif_sub_ifd_tags(f: BinaryIO, header: TIFFHeader,
         if entry.tag_id not in EXIF_SUB_IFD_PHI_TAGS:
             continue
         raw = read_tag_value_bytes(f, entry)
-        if not raw or raw == b'\x00' * len(raw):
-            continue
         stripped = raw.rstrip(b'\x00')
-        if stripped and all(b == ord('X') for b in stripped):
+        if not stripped or stripped.count(b'X') == len(stripped):
             continue
-        value = stripped.decode('utf-8', errors='replace')[:200]
+        # 200 characters never take more than 800 UTF-8 bytes
+        value = stripped[:800].decode('utf-8', errors='replace')[:200]
         if value.strip():
             findings.append((entry, value))
     return findings
@@ -116,7 +115,7 @@ def scan_gps_sub_ifd(f: BinaryIO, header: TIFFHeader,
     findings = []
     for entry in entries:
         raw = read_tag_value_bytes(f, entry)
-        if not raw or raw == b'\x00' * len(raw):
+        if raw.count(0) == len(raw):  # empty or all zeros
             continue
         # For RATIONAL types (lat/lon), show numeric preview
         if entry.dtype in (5, 10):  # RATIONAL / SRATIONAL
@@ -141,10 +140,8 @@ def blank_exif_sub_ifd_tags(f: BinaryIO, header: TIFFHeader,
         if entry.tag_id not in EXIF_SUB_IFD_PHI_TAGS:
             continue
         raw = read_tag_value_bytes(f, entry)
-        if not raw or raw == b'\x00' * len(raw):
-            continue
         stripped = raw.rstrip(b'\x00')
-        if stripped and all(b == ord('X') for b in stripped):
+        if not stripped or stripped.count(b'X') == len(stripped):
             continue
         f.seek(entry.value_offset)
         f.write(b'\x00' * entry.total_size)
@@ -158,7 +155,7 @@ def blank_gps_sub_ifd(f: BinaryIO, header: TIFFHeader,
     total = 0
     for entry in entries:
         raw = read_tag_value_bytes(f, entry)
-        if not raw or raw == b'\x00' * len(raw):
+        if raw.count(0) == len(raw):  # empty or all zeros
             continue
         f.seek(entry.value_offset)
         f.write(b'\x00' * entry.total_size)
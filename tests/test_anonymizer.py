@@ -217,3 +217,10 @@ class TestScanBatch:
     def test_scan_batch_parallel(self, tmp_ndpi):
         results = scan_batch(tmp_ndpi, workers=2)
         assert len(results) == 1
+
+    def test_scan_batch_processes(self, tmp_ndpi, tmp_svs):
+        files = [tmp_ndpi, tmp_svs]
+        threaded = scan_batch(None, file_list=files, workers=2)
+        pooled = scan_batch(None, file_list=files, workers=2, processes=True)
+        assert ([(fp, r.is_clean, len(r.findings)) for fp, r in pooled]
+                == [(fp, r.is_clean, len(r.findings)) for fp, r in threaded])
@@ -202,3 +202,15 @@ class TestInfoCommand:
     def test_info_directory_rejected(self, runner, tmp_path):
         result = runner.invoke(main, ['info', str(tmp_path)])
         assert result.exit_code == 1
+
+
+class TestFrozenEntryPoint:
+    def test_freeze_support_runs_before_cli(self, monkeypatch):
+        import multiprocessing
+        import pathsafe.cli as cli
+        calls = []
+        monkeypatch.setattr(multiprocessing, 'freeze_support',
+                            lambda: calls.append('freeze_support'))
+        monkeypatch.setattr(cli, 'main', lambda: calls.append('main'))
+        cli.run()
+        assert calls == ['freeze_support', 'main']
@@ -0,0 +1,434 @@
+"""Tests for the optional OpenSlide helpers."""
+
+import builtins
+import importlib
+import sys
+import threading
+import types
+
+import pytest
+
+from pathsafe import openslide_utils
+from tests.conftest import build_tiff
+
+
+class _FakeOpenSlideError(Exception):
+    pass
+
+
+class _FakeSlide:
+    """Minimal stand-in for openslide.OpenSlide."""
+
+    opens = 0
+    associated = ('thumbnail', 'label', 'macro')
+
+    def __init__(self, path):
+        type(self).opens += 1
+        self.closed = False
+        self.associated_images = dict.fromkeys(self.associated)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def fake_openslide(monkeypatch):
+    """Reload openslide_utils against a fake ``openslide`` module."""
+    module = types.ModuleType('openslide')
+    module.__spec__ = importlib.machinery.ModuleSpec('openslide', None)
+    module.OpenSlide = _FakeSlide
+    module.OpenSlideError = _FakeOpenSlideError
+    _FakeSlide.opens = 0
+    monkeypatch.setitem(sys.modules, 'openslide', module)
+    yield importlib.reload(openslide_utils)
+    monkeypatch.undo()
+    importlib.reload(openslide_utils)
+
+
+@pytest.mark.skipif(openslide_utils.is_available(),
+                    reason="OpenSlide is installed")
+class TestWithoutOpenSlide:
+    """Every helper returns its empty value when OpenSlide is missing."""
+
+    def test_detect_vendor(self, tmp_path):
+        assert openslide_utils.detect_vendor(tmp_path / 'x.svs') is None
+
+    def test_get_properties(self, tmp_path):
+        assert openslide_utils.get_properties(tmp_path / 'x.svs') == {}
+
+    def test_associated_images(self, tmp_path):
+        path = tmp_path / 'x.svs'
+        assert openslide_utils.get_associated_image_names(path) == []
+        assert openslide_utils.has_label_image(path) is False
+        assert openslide_utils.has_macro_image(path) is False
+
+    def test_get_slide_info(self, tmp_path):
+        info = openslide_utils.get_slide_info(str(tmp_path / 'x.svs'))
+        assert info == {'openslide_available': False}
+
+    def test_stubs_keep_docstrings(self):
+        assert 'vendor' in openslide_utils.detect_vendor.__doc__
+        assert openslide_utils.get_slide_info.__name__ == 'get_slide_info'
+
+
+class TestAssociatedImages:
+    """Associated image names are read once and shared."""
+
+    def test_label_and_macro_share_one_open(self, fake_openslide, tmp_path):
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        assert fake_openslide.has_label_image(path)
+        assert fake_openslide.has_macro_image(path)
+        assert _FakeSlide.opens == 1
+
+    def test_names_list(self, fake_openslide, tmp_path):
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        names = fake_openslide.get_associated_image_names(str(path))
+        assert names == ['label', 'macro', 'thumbnail']
+
+    def test_missing_file(self, fake_openslide, tmp_path):
+        assert fake_openslide.has_label_image(tmp_path / 'nope.svs') is False
+
+
+class TestLazyImport:
+    """openslide is only imported when a slide is read or availability checked."""
+
+    def test_module_import_does_not_load(self, fake_openslide):
+        assert fake_openslide.HAS_OPENSLIDE is True
+        assert fake_openslide._openslide is None
+
+    def test_is_available_loads_library(self, fake_openslide):
+        assert fake_openslide.is_available() is True
+        assert fake_openslide._openslide is sys.modules['openslide']
+
+    def test_first_use_imports(self, fake_openslide, tmp_path):
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        fake_openslide.has_label_image(path)
+        assert fake_openslide._openslide is sys.modules['openslide']
+
+
+class TestNativeLibraryMissing:
+    """openslide-python installed but libopenslide fails to load."""
+
+    @pytest.fixture
+    def broken(self, fake_openslide, monkeypatch):
+        attempts = []
+        real_import = builtins.__import__
+
+        def fake_import(name, *args, **kwargs):
+            if name == 'openslide':
+                attempts.append(name)
+                raise OSError('libopenslide.so.1: cannot open shared object')
+            return real_import(name, *args, **kwargs)
+        monkeypatch.setattr(builtins, '__import__', fake_import)
+        return attempts
+
+    def test_not_available_and_cached(self, fake_openslide, broken):
+        assert fake_openslide.is_available() is False
+        assert fake_openslide.is_available() is False
+        assert broken == ['openslide']
+
+    def test_helpers_return_empty(self, fake_openslide, broken, tmp_path):
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        assert fake_openslide.get_properties(path) == {}
+        assert fake_openslide.has_label_image(path) is False
+        assert fake_openslide.detect_vendor(path) is None
+        assert fake_openslide.get_slide_info(path) == {
+            'openslide_available': False}
+        assert broken == ['openslide']
+
+
+class TestProperties:
+    """get_properties returns a cached read-only view."""
+
+    def test_read_only_and_cached(self, fake_openslide, tmp_path, monkeypatch):
+        monkeypatch.setattr(_FakeSlide, 'properties',
+                            {'openslide.vendor': 'aperio'}, raising=False)
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        props = fake_openslide.get_properties(path)
+        assert props['openslide.vendor'] == 'aperio'
+        with pytest.raises(TypeError):
+            props['openslide.vendor'] = 'x'
+        assert fake_openslide.get_properties(path) is props
+        assert _FakeSlide.opens == 1
+
+    def test_unreadable_file(self, fake_openslide, tmp_path):
+        assert fake_openslide.get_properties(tmp_path / 'nope.svs') == {}
+
+
+class TestDetectVendor:
+    """detect_vendor answers from the header before asking OpenSlide."""
+
+    @pytest.fixture
+    def detect_format(self, fake_openslide, monkeypatch):
+        calls = []
+
+        def detect(path):
+            calls.append(path)
+            return 'aperio'
+        monkeypatch.setattr(_FakeSlide, 'detect_format', staticmethod(detect),
+                            raising=False)
+        return calls
+
+    def test_ndpi_from_header(self, fake_openslide, detect_format, tmp_path):
+        path = tmp_path / 'slide.NDPI'
+        path.write_bytes(build_tiff([(65420, 4, 1, 1)]))
+        assert fake_openslide.detect_vendor(path) == 'hamamatsu'
+        assert detect_format == []
+
+    def test_scn_from_header(self, fake_openslide, detect_format, tmp_path):
+        xml = (b'<scn xmlns="http://www.leica-microsystems.com/scn/'
+               b'2010/10/01"></scn>\x00')
+        path = tmp_path / 'slide.scn'
+        path.write_bytes(build_tiff([(270, 2, len(xml), xml)]))
+        assert fake_openslide.detect_vendor(path) == 'leica'
+        assert detect_format == []
+
+    def test_dicom_from_header(self, fake_openslide, detect_format, tmp_path):
+        path = tmp_path / 'slide.dcm'
+        path.write_bytes(b'\x00' * 128 + b'DICM'
+                         + b'1.2.840.10008.5.1.4.1.1.77.1.6\x00')
+        assert fake_openslide.detect_vendor(path) == 'dicom'
+        assert detect_format == []
+
+    def test_plain_tiff_named_ndpi_asks_openslide(self, fake_openslide,
+                                                  detect_format, tmp_path):
+        path = tmp_path / 'photo.ndpi'
+        path.write_bytes(build_tiff([(256, 3, 1, 64)]))
+        fake_openslide.detect_vendor(path)
+        assert detect_format == [str(path)]
+
+    def test_non_slide_dicom_asks_openslide(self, fake_openslide,
+                                            detect_format, tmp_path):
+        path = tmp_path / 'ct.dcm'
+        path.write_bytes(b'\x00' * 128 + b'DICM'
+                         + b'1.2.840.10008.5.1.4.1.1.2\x00')  # CT Image Storage
+        fake_openslide.detect_vendor(path)
+        assert detect_format == [str(path)]
+
+    def test_mrxs_needs_slidedat(self, fake_openslide, detect_format, tmp_path):
+        path = tmp_path / 'slide.mrxs'
+        path.write_bytes(b'')
+        fake_openslide.detect_vendor(path)
+        assert len(detect_format) == 1
+        (tmp_path / 'slide').mkdir()
+        (tmp_path / 'slide' / 'Slidedat.ini').write_text('[GENERAL]\n')
+        assert fake_openslide.detect_vendor(path) == 'mirax'
+        assert len(detect_format) == 1
+
+    def test_ambiguous_tiff_falls_through(self, fake_openslide, detect_format,
+                                          tmp_path):
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00' + b'\x00' * 16)
+        assert fake_openslide.detect_vendor(path) == 'aperio'
+        assert detect_format == [str(path)]
+
+    def test_missing_file(self, fake_openslide, detect_format, tmp_path):
+        assert fake_openslide.detect_vendor(tmp_path / 'nope.ndpi') is None
+
+
+class TestHandlePool:
+    """Open handles are reused across helpers and evicted LRU-first."""
+
+    def test_helpers_share_handle(self, fake_openslide, tmp_path, monkeypatch):
+        monkeypatch.setattr(_FakeSlide, 'properties', {}, raising=False)
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        fake_openslide.get_properties(path)
+        fake_openslide.has_macro_image(path)
+        assert _FakeSlide.opens == 1
+
+    def test_eviction_closes_handle(self, fake_openslide, tmp_path):
+        pool = fake_openslide._HandlePool(maxsize=1)
+        with pool.lease(str(tmp_path / 'a.svs'), 1) as first:
+            pass
+        with pool.lease(str(tmp_path / 'a.svs'), 1) as again:
+            assert again is first
+        with pool.lease(str(tmp_path / 'b.svs'), 1):
+            pass
+        assert first.closed
+
+    def test_changed_file_reopens(self, fake_openslide, tmp_path):
+        pool = fake_openslide._HandlePool()
+        with pool.lease(str(tmp_path / 'a.svs'), 1) as first:
+            pass
+        with pool.lease(str(tmp_path / 'a.svs'), 2) as second:
+            assert second is not first
+        assert first.closed
+
+    def test_close_all(self, fake_openslide, tmp_path):
+        pool = fake_openslide._HandlePool()
+        with pool.lease(str(tmp_path / 'a.svs'), 1) as slide:
+            pass
+        pool.close_all()
+        assert slide.closed
+
+    def test_eviction_waits_for_lease(self, fake_openslide, tmp_path):
+        """A handle evicted mid-read by another thread closes after the read."""
+        pool = fake_openslide._HandlePool(maxsize=1)
+        reading = threading.Event()
+        evicted = threading.Event()
+        seen = {}
+
+        def reader():
+            with pool.lease(str(tmp_path / 'a.svs'), 1) as slide:
+                seen['slide'] = slide
+                reading.set()
+                evicted.wait(5)
+                seen['closed_during_read'] = slide.closed
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        assert reading.wait(5)
+        with pool.lease(str(tmp_path / 'b.svs'), 1):
+            pass
+        pool.close_all()
+        evicted.set()
+        thread.join(5)
+        assert seen['closed_during_read'] is False
+        assert seen['slide'].closed
+
+
+class TestUnreadable:
+    """Unreadable paths short-circuit; only OpenSlide errors are swallowed."""
+
+    def test_directory_is_rejected(self, fake_openslide, tmp_path):
+        assert fake_openslide.get_properties(tmp_path) == {}
+        assert _FakeSlide.opens == 0
+
+    def test_slide_info_missing_file(self, fake_openslide, tmp_path):
+        info = fake_openslide.get_slide_info(tmp_path / 'nope.svs')
+        assert info['openslide_available'] is True
+        assert 'error' in info
+        assert _FakeSlide.opens == 0
+
+    def test_openslide_error_is_handled(self, fake_openslide, tmp_path,
+                                        monkeypatch):
+        def fail(self, path):
+            raise _FakeOpenSlideError('unsupported')
+        monkeypatch.setattr(_FakeSlide, '__init__', fail)
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        assert fake_openslide.get_associated_image_names(path) == []
+        info = fake_openslide.get_slide_info(path)
+        assert info['error'] == 'unsupported'
+
+    def test_other_errors_propagate(self, fake_openslide, tmp_path,
+                                    monkeypatch):
+        def fail(self, path):
+            raise ValueError('bug')
+        monkeypatch.setattr(_FakeSlide, '__init__', fail)
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        with pytest.raises(ValueError):
+            fake_openslide.get_properties(path)
+
+
+class TestSlideInfo:
+    """get_slide_info assembles its fields from the cached lookups."""
+
+    def test_fields(self, fake_openslide, tmp_path, monkeypatch):
+        monkeypatch.setattr(_FakeSlide, 'properties', {
+            'openslide.vendor': 'aperio',
+            'openslide.mpp-x': '0.25',
+            'openslide.mpp-y': 'n/a',
+            'openslide.objective-power': '40',
+        }, raising=False)
+        monkeypatch.setattr(_FakeSlide, 'level_count', 2, raising=False)
+        monkeypatch.setattr(_FakeSlide, 'dimensions', (200, 100),
+                            raising=False)
+        monkeypatch.setattr(_FakeSlide, 'level_dimensions',
+                            ((200, 100), (100, 50)), raising=False)
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'II*\x00')
+        info = fake_openslide.get_slide_info(path)
+        assert info['vendor'] == 'aperio'
+        assert info['level_count'] == 2
+        assert info['dimensions'] == (200, 100)
+        assert info['mpp_x'] == 0.25
+        assert info['mpp_y'] is None
+        assert info['objective_power'] == 40.0
+        assert info['associated_images'] == ['label', 'macro', 'thumbnail']
+        assert info['property_count'] == 4
+        again = fake_openslide.get_slide_info(str(path))
+        assert again['vendor'] is info['vendor']
+        fake_openslide.get_properties(path)
+        assert _FakeSlide.opens == 1
+
+
+class TestColumns:
+    """scan_many_columns returns one array per field."""
+
+    @pytest.fixture
+    def slides(self, fake_openslide, tmp_path, monkeypatch):
+        monkeypatch.setattr(_FakeSlide, 'properties', {
+            'openslide.vendor': 'aperio',
+            'openslide.mpp-x': '0.25',
+        }, raising=False)
+        monkeypatch.setattr(_FakeSlide, 'level_count', 3, raising=False)
+        monkeypatch.setattr(_FakeSlide, 'dimensions', (400, 300),
+                            raising=False)
+        monkeypatch.setattr(_FakeSlide, 'level_dimensions', ((400, 300),),
+                            raising=False)
+        good = tmp_path / 'a.svs'
+        good.write_bytes(b'II*\x00')
+        return [good, tmp_path / 'missing.svs']
+
+    def test_collect(self, fake_openslide, slides):
+        record = fake_openslide.collect(slides[0], ('vendor', 'mpp_x', 'mpp_y'))
+        assert record == {'vendor': 'aperio', 'mpp_x': 0.25, 'mpp_y': None}
+
+    def test_columns(self, fake_openslide, slides):
+        np = pytest.importorskip('numpy')
+        cols = fake_openslide.scan_many_columns(slides)
+        assert set(cols) == set(fake_openslide.SLIDE_FIELDS)
+        assert list(cols['vendor']) == ['aperio', None]
+        assert list(cols['width']) == [400, -1]
+        assert cols['mpp_x'][0] == 0.25
+        assert np.isnan(cols['mpp_x'][1])
+        assert list(cols['mpp_x'] < 0.5) == [True, False]
+
+
+class TestScanDirectory:
+    """scan_directory only collects files with slide extensions."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / 'b.svs').write_bytes(b'II*\x00')
+        (tmp_path / 'a.NDPI').write_bytes(b'II*\x00')
+        (tmp_path / 'notes.txt').write_text('x')
+        (tmp_path / 'sub').mkdir()
+        (tmp_path / 'sub' / 'c.scn').write_bytes(b'II*\x00')
+        return tmp_path
+
+    def test_flat(self, tree):
+        names = [p.name for p, _ in
+                 openslide_utils.scan_directory(tree, fields=('vendor',))]
+        assert names == ['a.NDPI', 'b.svs']
+
+    def test_recursive(self, tree):
+        names = sorted(p.name for p, _ in
+                       openslide_utils.scan_directory(tree, recursive=True))
+        assert names == ['a.NDPI', 'b.svs', 'c.scn']
+
+    def test_records(self, tree):
+        for _, record in openslide_utils.scan_directory(tree,
+                                                        fields=('mpp_x',)):
+            assert set(record) == {'mpp_x'}
+
+
+def test_vendor_strings_are_interned():
+    built = ''.join(['ham', 'amatsu'])
+    assert openslide_utils._intern_vendor(built) is \
+        openslide_utils._intern_vendor('hamamatsu')
+    assert openslide_utils._intern_vendor(None) is None
@@ -99,3 +99,29 @@ class TestPatternConfigFromJSON:
         labels = {label for _, _, _, label in findings}
         assert 'Accession_AS' in labels
         assert 'Lab_Accession' in labels
+
+    def test_custom_labels_are_interned(self, tmp_path):
+        import sys
+        config_file = tmp_path / "patterns.json"
+        config_file.write_text(json.dumps({
+            "byte_patterns": [["LAB-\\d{4}", "Lab " + "Accession"]],
+        }))
+
+        config = PatternConfig.from_json(config_file)
+        label = config.byte_patterns[-1][1]
+        assert label is sys.intern('Lab Accession')
+
+
+class TestStringPrefilterCache:
+    """PatternConfig caches its combined string prefilter."""
+
+    def test_prefilter_reused(self):
+        config = PatternConfig.default()
+        assert config.string_prefilter() is config.string_prefilter()
+
+    def test_prefilter_follows_edits(self):
+        config = PatternConfig.default()
+        assert scan_string_for_phi('LAB-2024', patterns=config) == []
+        config.string_patterns.append((re.compile(r'LAB-\d{4}'), 'Lab'))
+        findings = scan_string_for_phi('LAB-2024', patterns=config)
+        assert findings == [(0, 8, 'LAB-2024', 'Lab')]
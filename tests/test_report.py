@@ -1,13 +1,15 @@
 """Tests for the compliance certificate report module."""
 
 import json
+from datetime import datetime, timedelta, timezone
 import pytest
 from pathlib import Path
 
 from pathsafe.models import AnonymizationResult, BatchResult
 from pathsafe.report import (
     generate_certificate, generate_pdf_certificate, generate_scan_report,
-    _detect_format_from_ext, friendly_tag_name,
+    _detect_format_from_ext, _sanitize_for_pdf, _sanitize_many_for_pdf,
+    _sha256_file, friendly_tag_name, sha256_files, write_json,
 )
 
 
@@ -53,6 +55,22 @@ class TestGenerateCertificate:
         assert 'measures' in cert
         assert 'files' in cert
 
+    def test_generated_at_is_utc_isoformat(self):
+        before = datetime.now(timezone.utc)
+        cert = generate_certificate(_make_batch_result())
+        stamp = datetime.fromisoformat(cert['generated_at'])
+        assert stamp.utcoffset() == timedelta(0)
+        assert before - timedelta(seconds=1) <= stamp <= datetime.now(timezone.utc)
+
+    def test_certificate_id_is_uuid4(self):
+        import uuid
+        ids = {generate_certificate(_make_batch_result())['certificate_id']
+               for _ in range(3)}
+        assert len(ids) == 3
+        for cert_id in ids:
+            assert uuid.UUID(cert_id).version == 4
+            assert str(uuid.UUID(cert_id)) == cert_id
+
     def test_summary_stats(self):
         batch = _make_batch_result(n_files=3)
         cert = generate_certificate(batch)
@@ -278,6 +296,23 @@ class TestGenerateCertificateWithPdf:
         cert = generate_certificate(batch, pdf=True)
         assert 'certificate_id' in cert
 
+    def test_sha256_taken_from_result_not_rehashed(self, tmp_path,
+                                                    monkeypatch):
+        import pathsafe.report as report
+
+        def fail(*args, **kwargs):
+            raise AssertionError('output file was re-hashed')
+        monkeypatch.setattr(report, '_sha256_file', fail)
+        monkeypatch.setattr(report, 'sha256_files', fail)
+
+        batch = _make_batch_result(n_files=2)
+        batch.results[0].sha256_after = 'a' * 64
+        cert_path = tmp_path / 'cert.json'
+        cert = generate_certificate(batch, output_path=cert_path)
+        assert cert['files'][0]['sha256_after'] == 'a' * 64
+        assert 'sha256_after' not in cert['files'][1]
+        assert cert_path.with_suffix('.pdf').exists()
+
     def test_pdf_companion_has_same_stem(self, tmp_path):
         batch = _make_batch_result()
         cert_path = tmp_path / 'my_certificate.json'
@@ -318,6 +353,169 @@ class TestDetectFormatFromExt:
         assert _detect_format_from_ext(Path('slide.xyz')) == 'unknown'
 
 
+class TestSanitizeForPdf:
+    def test_printable_ascii_unchanged(self):
+        text = ''.join(chr(c) for c in range(0x20, 0x7F))
+        assert _sanitize_for_pdf(text) == text
+
+    def test_replaces_each_bad_char(self):
+        assert _sanitize_for_pdf('caf\u00e9\x00\t\x7f\U0001F600') == 'caf?????'
+
+    def test_matches_char_filter(self):
+        text = ''.join(chr(c) for c in range(0x300)) + '\ud800'
+        expected = ''.join(c if 0x20 <= ord(c) <= 0x7E else '?' for c in text)
+        assert _sanitize_for_pdf(text) == expected
+
+    def test_many_matches_single(self):
+        texts = ['Barcode', 'caf\u00e9', '', '\x00\x7f', 'plain']
+        assert _sanitize_many_for_pdf(texts) == [
+            _sanitize_for_pdf(t) for t in texts]
+
+    def test_many_with_embedded_newline(self):
+        texts = ['a\nb', 'c']
+        assert _sanitize_many_for_pdf(texts) == ['a?b', 'c']
+
+    def test_many_empty(self):
+        assert _sanitize_many_for_pdf([]) == []
+
+
+class TestWriteJson:
+    def test_certificate_json_round_trips(self, tmp_path):
+        batch = _make_batch_result(n_files=2)
+        out = tmp_path / 'cert.json'
+        cert = generate_certificate(batch, output_path=out, pdf=False)
+        assert json.loads(out.read_text(encoding='utf-8')) == cert
+
+    def test_streamed_output_matches_stdlib_layout(self, tmp_path):
+        batch = _make_batch_result(n_files=3, integrity=True)
+        cert = generate_certificate(batch)
+        cert['empty'] = []
+        out = tmp_path / 'cert.json'
+        import pathsafe.report as report
+        report.write_json(cert, out)
+        assert out.read_text() == json.dumps(cert, indent=2)
+
+    def test_empty_dict(self, tmp_path):
+        import pathsafe.report as report
+        out = tmp_path / 'empty.json'
+        report.write_json({}, out)
+        assert json.loads(out.read_text()) == {}
+
+    def test_top_level_list_matches_stdlib_layout(self, tmp_path):
+        import pathsafe.report as report
+        data = [{'filepath': '/a.svs', 'findings': [{'tag_name': 'X'}]},
+                {'filepath': '/b.svs', 'findings': []}]
+        out = tmp_path / 'scan.json'
+        report.write_json(data, out)
+        assert out.read_text() == json.dumps(data, indent=2)
+        report.write_json([], out)
+        assert out.read_text() == '[]'
+
+    def test_stdlib_fallback(self, tmp_path, monkeypatch):
+        import pathsafe.report as report
+        monkeypatch.setattr(report, 'HAS_ORJSON', False)
+        out = tmp_path / 'cert.json'
+        report.write_json({'a': [1, 2]}, out)
+        assert out.read_text() == '{\n  "a": [\n    1,\n    2\n  ]\n}'
+
+    def test_non_ascii_stdlib_escapes(self, tmp_path, monkeypatch):
+        import pathsafe.report as report
+        monkeypatch.setattr(report, 'HAS_ORJSON', False)
+        out = tmp_path / 'cert.json'
+        write_json({'operator': 'M\u00fcller'}, out)
+        assert b'M\\u00fcller' in out.read_bytes()
+        assert json.loads(out.read_bytes()) == {'operator': 'M\u00fcller'}
+
+    def test_non_ascii_orjson_raw_utf8(self, tmp_path):
+        import pathsafe.report as report
+        if not report.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        out = tmp_path / 'cert.json'
+        write_json({'operator': 'M\u00fcller'}, out)
+        assert 'M\u00fcller'.encode('utf-8') in out.read_bytes()
+        assert json.loads(out.read_bytes()) == {'operator': 'M\u00fcller'}
+
+    def test_nan_stdlib(self, tmp_path, monkeypatch):
+        import pathsafe.report as report
+        monkeypatch.setattr(report, 'HAS_ORJSON', False)
+        out = tmp_path / 'cert.json'
+        write_json({'mpp': float('nan')}, out)
+        assert '"mpp": NaN' in out.read_text()
+
+    def test_nan_orjson_writes_null(self, tmp_path):
+        import pathsafe.report as report
+        if not report.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        out = tmp_path / 'cert.json'
+        write_json({'mpp': float('nan')}, out)
+        assert json.loads(out.read_bytes()) == {'mpp': None}
+
+
+class TestSha256File:
+    def test_matches_hashlib(self, tmp_path):
+        import hashlib
+        data = bytes(range(256)) * 5000  # spans several read chunks
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(data)
+        assert _sha256_file(path) == hashlib.sha256(data).hexdigest()
+
+    def test_readinto_fallback(self, tmp_path, monkeypatch):
+        import hashlib
+        monkeypatch.delattr(hashlib, 'file_digest', raising=False)
+        data = b'PATHSAFE' * 300000  # > 1 MiB, not a multiple of the buffer
+        path = tmp_path / 'slide.ndpi'
+        path.write_bytes(data)
+        assert _sha256_file(path) == hashlib.sha256(data).hexdigest()
+
+    def test_empty_file(self, tmp_path):
+        import hashlib
+        path = tmp_path / 'empty.svs'
+        path.write_bytes(b'')
+        assert _sha256_file(path) == hashlib.sha256(b'').hexdigest()
+
+    def test_many_files(self, tmp_path):
+        import hashlib
+        paths = []
+        for i in range(5):
+            path = tmp_path / f'slide{i}.svs'
+            path.write_bytes(bytes([i]) * 1000)
+            paths.append(path)
+        missing = tmp_path / 'missing.svs'
+        hashes = sha256_files(paths + [missing])
+        for i, path in enumerate(paths):
+            assert hashes[path] == hashlib.sha256(bytes([i]) * 1000).hexdigest()
+        assert hashes[missing] == ''
+        assert sha256_files([]) == {}
+
+    def test_progress_and_stop(self, tmp_path):
+        paths = []
+        for i in range(4):
+            path = tmp_path / f'slide{i}.svs'
+            path.write_bytes(b'x' * 100)
+            paths.append(path)
+        seen = []
+        checks = iter([False, False])  # stop before the third file
+        hashes = sha256_files(paths, max_workers=1,
+                              progress_callback=lambda d, t, p: seen.append((d, t)),
+                              stop_check=lambda: next(checks, True))
+        assert seen == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        assert list(hashes) == paths
+        assert hashes[paths[0]] and hashes[paths[1]]
+        assert hashes[paths[2]] == hashes[paths[3]] == ''
+
+    def test_rehashes_same_size_reset_mtime(self, tmp_path):
+        """In-place rewrite + reset_timestamps must not reuse the old digest."""
+        import hashlib
+        import os
+        path = tmp_path / 'slide.svs'
+        path.write_bytes(b'AAAA')
+        os.utime(path, (0, 0))
+        assert _sha256_file(path) == hashlib.sha256(b'AAAA').hexdigest()
+        path.write_bytes(b'BBBB')
+        os.utime(path, (0, 0))
+        assert _sha256_file(path) == hashlib.sha256(b'BBBB').hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Scan report tests
 # ---------------------------------------------------------------------------
@@ -533,6 +731,12 @@ class TestFriendlyTagName:
         assert friendly_tag_name('DateTime') == 'Date/Time'
         assert friendly_tag_name('ICCProfile') == 'ICC Color Profile'
 
+    def test_results_are_cached(self):
+        friendly_tag_name.cache_clear()
+        friendly_tag_name('NDPI_SERIAL_NUMBER')
+        friendly_tag_name('NDPI_SERIAL_NUMBER')
+        assert friendly_tag_name.cache_info().hits == 1
+
     def test_exif_prefix(self):
         assert friendly_tag_name('EXIF:DateTimeOriginal') == 'EXIF: Date/Time Original'
         assert friendly_tag_name('EXIF:UserComment') == 'EXIF: User Comment'
@@ -44,17 +44,99 @@ class TestScanBytesForPHI:
         findings = scan_bytes_for_phi(data, skip_offsets={0})
         assert len(findings) == 0
 
+    def test_extends_to_nearby_null(self):
+        data = b'AS-24-123456 Doe^Jane\x00tail'
+        findings = scan_bytes_for_phi(data)
+        assert findings[0][2] == b'AS-24-123456 Doe^Jane'
+
+    def test_distant_null_not_followed(self):
+        data = b'AS-24-123456' + b'\xff' * 4096 + b'\x00'
+        findings = scan_bytes_for_phi(data)
+        assert findings[0][1:3] == (12, b'AS-24-123456')
+
     def test_no_false_positives(self):
         data = b'This is normal text with no PHI patterns at all.'
         findings = scan_bytes_for_phi(data)
         assert len(findings) == 0
 
+    @pytest.mark.parametrize('data,expected', [
+        (b'H-24-12345', ['Accession_H']),
+        (b'xS-24-12345', ['Accession_S']),
+        (b'1H-24-12345', ['Accession_H']),
+        (b'XH-24-12345', []),
+        (b'AS-24-12345', ['Accession_AS']),
+    ])
+    def test_single_letter_prefix_boundary(self, data, expected):
+        assert [f[3] for f in scan_bytes_for_phi(data)] == expected
+        assert [f[3] for f in scan_string_for_phi(data.decode())] == expected
+
+    @pytest.mark.parametrize('data,expected', [
+        (b'123-45-6789', [(0, 11)]),
+        (b'x123-45-6789x', [(1, 11)]),
+        (b'0123-45-6789', []),
+        (b'123-45-67890', []),
+        (b'12-123-45-6789', [(3, 11)]),
+    ])
+    def test_ssn_digit_boundary(self, data, expected):
+        spans = [(f[0], f[1]) for f in scan_bytes_for_phi(data)
+                 if f[3] == 'SSN_Pattern']
+        assert spans == expected
+
     def test_multiple_findings(self):
         data = b'AS-24-111111\x00padding\x00AC-23-222222\x00'
         findings = scan_bytes_for_phi(data)
         assert len(findings) == 2
 
 
+class TestHyperscanPrefilter:
+    SAMPLES = [
+        b'\x00\x00AS-24-123456\x00\x00',
+        b'x S-24-123\x00 XS-24-123 123-45-6789 1234-56-7890',
+        b'MRN:1234567 DOB-19800115 CH123456 00000AS123',
+        b'2024:06:15 10:30:00 1900:01:01 00:00:00 2023/01/02',
+        b'This is normal text with no PHI patterns at all.',
+        b'',
+    ]
+
+    def test_same_findings_as_re(self, monkeypatch):
+        pytest.importorskip('hyperscan')
+        import pathsafe.scanner as scanner
+        with_hs = [(scan_bytes_for_phi(d), scan_bytes_for_dates(d))
+                   for d in self.SAMPLES]
+        monkeypatch.setattr(scanner, 'HAS_HYPERSCAN', False)
+        without = [(scan_bytes_for_phi(d), scan_bytes_for_dates(d))
+                   for d in self.SAMPLES]
+        assert with_hs == without
+
+    def test_only_fired_patterns_run(self):
+        pytest.importorskip('hyperscan')
+        from pathsafe.scanner import PHI_BYTE_PATTERNS, _candidate_patterns
+        labels = [label for _, label in
+                  _candidate_patterns(PHI_BYTE_PATTERNS, b'x MRN:1234567 x')]
+        assert labels == ['MRN_Pattern']
+        assert _candidate_patterns(PHI_BYTE_PATTERNS, b'clean') == []
+
+
+class TestPCRE2Engine:
+    def test_same_findings_as_re(self, monkeypatch):
+        pytest.importorskip('pcre2')
+        import pathsafe.scanner as scanner
+        samples = TestHyperscanPrefilter.SAMPLES + [
+            b'\xff\x00AH-24-123 H-24-1234\x00 0123-45-6789 2019:01:01 10:10:1999-01-01']
+        assert scanner._jit_patterns()
+        with_jit = [(scan_bytes_for_phi(d), scan_bytes_for_dates(d))
+                    for d in samples]
+        monkeypatch.setattr(scanner, '_jit_patterns', dict)
+        without = [(scan_bytes_for_phi(d), scan_bytes_for_dates(d))
+                   for d in samples]
+        assert with_jit == without
+
+    def test_custom_patterns_stay_on_re(self):
+        import re
+        from pathsafe.scanner import _jit_patterns
+        assert re.compile(rb'LAB-\d{,4}') not in _jit_patterns()
+
+
 class TestScanStringForPHI:
     def test_detect_in_string(self):
         findings = scan_string_for_phi('Filename=AS-24-999999.svs')
@@ -64,6 +146,51 @@ class TestScanStringForPHI:
         findings = scan_string_for_phi('AppMag = 40|MPP = 0.2520')
         assert len(findings) == 0
 
+    def test_short_values_below_builtin_min_len(self):
+        try:
+            from re import _parser
+        except ImportError:  # Python < 3.11
+            import sre_parse as _parser
+        from pathsafe.scanner import (
+            PHI_STRING_PATTERNS, _BUILTIN_STRING_MIN_LEN,
+        )
+        widths = [_parser.parse(p.pattern).getwidth()[0]
+                  for p, _ in PHI_STRING_PATTERNS]
+        assert min(widths) == _BUILTIN_STRING_MIN_LEN
+        assert scan_string_for_phi('CH1234') == []
+        assert scan_string_for_phi('CH12345') == [
+            (0, 7, 'CH12345', 'Accession_CH')]
+
+    def test_repeated_value_returns_fresh_list(self):
+        first = scan_string_for_phi('Case AS-24-123456')
+        first.clear()
+        assert scan_string_for_phi('Case AS-24-123456') == [
+            (5, 12, 'AS-24-123456', 'Accession_AS')]
+
+    def test_overlapping_patterns_all_reported(self):
+        # SSN and a later accession in one value; both patterns still report
+        findings = scan_string_for_phi('123-45-6789 SP-24-12345 S-24-999')
+        labels = sorted(label for _, _, _, label in findings)
+        assert labels == ['Accession_S', 'Accession_SP', 'SSN_Pattern']
+
+    def test_custom_pattern_with_group(self):
+        import re
+        from pathsafe.scanner import PatternConfig
+        config = PatternConfig.default()
+        config.string_patterns.append((re.compile(r'(ID)-(\d+)'), 'Custom'))
+        findings = scan_string_for_phi('x ID-42', patterns=config)
+        assert [f[3] for f in findings] == ['Custom']
+
+    def test_module_list_replaced_at_runtime(self, monkeypatch):
+        # pathsafe scan --patterns rebinds the module-level lists
+        import re
+        import pathsafe.scanner as scanner
+        assert scan_string_for_phi('LAB-2024') == []
+        monkeypatch.setattr(scanner, 'PHI_STRING_PATTERNS',
+                            scanner.PHI_STRING_PATTERNS
+                            + [(re.compile(r'LAB-\d{4}'), 'Lab')])
+        assert scan_string_for_phi('LAB-2024') == [(0, 8, 'LAB-2024', 'Lab')]
+
 
 class TestScanDates:
     def test_detect_tiff_datetime(self):
@@ -76,6 +203,38 @@ class TestScanDates:
         findings = scan_bytes_for_dates(data)
         assert len(findings) == 0
 
+    def test_skip_anonymized_keeps_live_dates(self):
+        data = b'1900:01:01 00:00:00\x001900/01/01 2024-05-06 1900-01-01'
+        findings = scan_bytes_for_dates(data)
+        assert findings == [(31, 10, b'2024-05-06', 'DateTime_ISO')]
+
+    def test_overlapping_formats_match_per_pattern_scan(self):
+        # An ISO date starting inside a TIFF datetime is still reported,
+        # and results keep the per-pattern order of DATE_BYTE_PATTERNS
+        import pathsafe.scanner as scanner
+        data = b'2023-01-02 2019:01:01 10:10:1999-01-01 2020/05/06'
+        findings = scan_bytes_for_dates(data)
+        assert [(off, label) for off, _, _, label in findings] == [
+            (11, 'DateTime_TIFF'), (39, 'DateTime_Slash'),
+            (0, 'DateTime_ISO'), (28, 'DateTime_ISO')]
+        # A reordered list isn't the default set and takes the re loop
+        config = scanner.PatternConfig(
+            date_byte_patterns=[(p, label) for p, label
+                                in reversed(scanner.DATE_BYTE_PATTERNS)])
+        custom = scan_bytes_for_dates(data, patterns=config)
+        assert sorted(custom) == sorted(findings)
+
+    def test_module_date_list_replaced_at_runtime(self, monkeypatch):
+        # pathsafe scan --patterns rebinds the module-level lists
+        import re
+        import pathsafe.scanner as scanner
+        monkeypatch.setattr(scanner, 'DATE_BYTE_PATTERNS',
+                            scanner.DATE_BYTE_PATTERNS
+                            + [(re.compile(rb'\d{2}\.\d{2}\.\d{4}'), 'Dotted')])
+        findings = scan_bytes_for_dates(b'2024-01-02 15.06.2023')
+        assert [label for _, _, _, label in findings] == [
+            'DateTime_ISO', 'Dotted']
+
 
 class TestIsDateAnonymized:
     def test_1900_sentinel(self):
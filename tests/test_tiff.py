@@ -4,9 +4,11 @@ import struct
 import pytest
 from pathsafe.tiff import (
     read_header, read_ifd, find_tag_in_first_ifd,
-    read_tag_string, read_tag_value_bytes, TAG_NAMES,
+    read_tag_string, read_tag_value_bytes, read_tag_long_array,
+    read_tag_numeric, read_ifd_link, TAG_NAMES,
 )
-from tests.conftest import build_tiff
+from pathsafe.tiff import parser
+from tests.conftest import build_bigtiff, build_tiff, build_tiff_multi_ifd
 
 
 class TestReadHeader:
@@ -43,6 +45,26 @@ class TestReadHeader:
             header = read_header(fh)
         assert header is None
 
+    @pytest.mark.parametrize('endian', ['<', '>'])
+    def test_bigtiff_header(self, tmp_path, endian):
+        f = tmp_path / 'big.tif'
+        f.write_bytes(build_bigtiff([(256, 3, 1, 64)], endian=endian))
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+        assert header.is_bigtiff
+        assert header.endian == endian
+        assert header.first_ifd_offset == 16
+
+    @pytest.mark.parametrize('data', [
+        b'II' + struct.pack('<H', 42) + b'\x08\x00',
+        b'MM' + struct.pack('>HHH', 43, 8, 0) + b'\x00' * 4,
+        b'II' + struct.pack('<HHHQ', 43, 4, 0, 16),  # bad bytesize
+    ])
+    def test_truncated_or_bad_header(self, tmp_path, data):
+        f = tmp_path / 'short.tif'
+        f.write_bytes(data)
+        with open(f, 'rb') as fh:
+            assert read_header(fh) is None
 
 class TestReadIFD:
     def test_read_entries(self, tmp_ndpi):
@@ -62,6 +84,55 @@ class TestReadIFD:
         barcode_entry = [e for e in entries if e.tag_id == 65468][0]
         assert barcode_entry.tag_name == 'NDPI_BARCODE'
 
+    @pytest.mark.parametrize('builder, first, size, field', [
+        (build_tiff, 10, 12, 4),
+        (build_bigtiff, 24, 20, 8),
+    ])
+    def test_entry_offsets(self, tmp_path, builder, first, size, field):
+        content = builder([
+            (256, 3, 1, 512),
+            (270, 2, 12, b'Description\x00'),
+        ])
+        f = tmp_path / 'offsets.tif'
+        f.write_bytes(content)
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            (width, desc), next_offset = read_ifd(
+                fh, header, header.first_ifd_offset)
+        assert next_offset == 0
+        assert width.entry_offset == first
+        assert width.is_inline
+        assert width.value_offset == first + size - field
+        assert desc.entry_offset == first + size
+        assert not desc.is_inline
+        assert content[desc.value_offset:desc.value_offset + 12] == b'Description\x00'
+
+    @pytest.mark.parametrize('content', [
+        build_tiff_multi_ifd([[(256, 3, 1, 64), (257, 3, 1, 64)],
+                              [(256, 3, 1, 32)]]),
+        build_bigtiff([(256, 3, 1, 64), (270, 2, 12, b'Description\x00')]),
+    ])
+    def test_ifd_link_matches_read_ifd(self, tmp_path, content):
+        f = tmp_path / 'chain.tif'
+        f.write_bytes(content)
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            offset = header.first_ifd_offset
+            while offset:
+                entries, next_offset = read_ifd(fh, header, offset)
+                assert read_ifd_link(fh, header, offset) == (len(entries), next_offset)
+                offset = next_offset
+
+    def test_ifd_link_truncated(self, tmp_path):
+        data = b'II' + struct.pack('<HI', 42, 8)
+        data += struct.pack('<H', 3)  # 3 entries, only 1 present
+        data += struct.pack('<HHII', 256, 3, 1, 100)
+        f = tmp_path / 'partial.tif'
+        f.write_bytes(data)
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            assert read_ifd_link(fh, header, 8) == (3, 0)
+            assert read_ifd_link(fh, header, 9999) == (0, 0)
 
 class TestFindTag:
     def test_find_existing_tag(self, tmp_ndpi):
@@ -99,3 +170,28 @@ class TestReadTagValues:
             barcode = [e for e in entries if e.tag_id == 65468][0]
             raw = read_tag_value_bytes(f, barcode)
         assert raw == b'AS-24-123456\x00'
+
+    @pytest.mark.parametrize('use_array', [True, False])
+    @pytest.mark.parametrize('endian', ['<', '>'])
+    def test_read_long_array(self, tmp_path, monkeypatch, endian, use_array):
+        if not use_array:
+            # Exercise the struct fallback for platforms without a
+            # matching array typecode
+            monkeypatch.setattr(parser, '_ARRAY_CODES', frozenset())
+        offsets = [1000, 70000, 2 ** 32 - 1]
+        content = build_tiff([
+            (273, 4, 3, struct.pack(endian + '3I', *offsets)),
+            (279, 3, 3, struct.pack(endian + '3H', 5, 65535, 0)),
+            (282, 5, 2, struct.pack(endian + '4I', 300, 1, 72, 1)),
+        ], endian=endian)
+        f = tmp_path / 'arrays.tif'
+        f.write_bytes(content)
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            entries, _ = read_ifd(fh, header, header.first_ifd_offset)
+            strips, counts, rational = entries
+            assert read_tag_long_array(fh, header, strips) == offsets
+            assert read_tag_long_array(fh, header, counts) == [5, 65535, 0]
+            # RATIONAL arrays come back as flat num/denom pairs
+            assert read_tag_long_array(fh, header, rational) == [300, 1, 72, 1]
+            assert read_tag_numeric(fh, header, strips) == offsets
@@ -8,11 +8,14 @@ from pathsafe.tiff import (
     compute_ifd_tile_hash, compute_image_hashes,
     is_ifd_image_blanked, blank_ifd_image_data,
     get_ifd_image_data_size, get_ifd_image_size,
-    read_tag_long_array,
+    read_tag_long_array, find_image_data_entries,
     scan_extra_metadata_tags, blank_extra_metadata_tag,
     EXTRA_METADATA_TAGS,
 )
-from tests.conftest import build_tiff, build_tiff_multi_ifd, build_tiff_with_strips
+from tests.conftest import (
+    build_tiff, build_tiff_multi_ifd, build_tiff_multi_ifd_with_strips,
+    build_tiff_with_strips,
+)
 
 
 class TestIterIFDs:
@@ -67,6 +70,34 @@ class TestComputeIFDTileHash:
             d2 = compute_ifd_tile_hash(f, header, entries)
         assert d1 == d2
 
+    def test_hash_follows_tag_order(self):
+        """Digest covers strips in tag order, whatever their file layout."""
+        import hashlib
+        a, b, c = b'A' * 100000, b'B' * 70000, b'C' * 5000
+        # Layout: C, A, B on disk; tag order: A, B, <empty>, C
+        data_start = 8 + 2 + 12 * 2 + 4 + 16 * 2
+        offsets = [data_start + len(c), data_start + len(c) + len(a), 0,
+                   data_start]
+        counts = [len(a), len(b), 0, len(c)]
+        entries = [
+            (273, 4, 4, struct.pack('<4I', *offsets)),
+            (279, 4, 4, struct.pack('<4I', *counts)),
+        ]
+        f = io.BytesIO(build_tiff(entries, extra_data=c + a + b))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        digest = compute_ifd_tile_hash(f, header, ifd_entries)
+        assert digest == hashlib.sha256(a + b + c).hexdigest()
+
+    def test_truncated_strip_hashes_short(self, tmp_tiff_with_strips):
+        """A strip cut off by EOF hashes the bytes that are there."""
+        content = tmp_tiff_with_strips.read_bytes()
+        f = io.BytesIO(content[:-50])
+        header = read_header(f)
+        _, entries = iter_ifds(f, header)[0]
+        assert (compute_ifd_tile_hash(f, header, entries)
+                != compute_ifd_tile_hash(io.BytesIO(content), header, entries))
+
     def test_no_strips_returns_none(self, tmp_ndpi):
         """IFD without strip/tile data returns None."""
         with open(tmp_ndpi, 'rb') as f:
@@ -88,12 +119,44 @@ class TestComputeImageHashes:
         hashes = compute_image_hashes(tmp_ndpi)
         assert hashes == {}
 
+    def test_multi_ifd_matches_per_ifd(self, tmp_path):
+        """Concurrent per-IFD hashing matches hashing each IFD in turn."""
+        f = tmp_path / 'pages.tif'
+        f.write_bytes(build_tiff_multi_ifd_with_strips([
+            ([(256, 3, 1, 64)], b'\x11' * 3000),
+            ([(256, 3, 1, 32)], None),
+            ([(256, 3, 1, 16)], b'\x22' * 500),
+            ([(256, 3, 1, 8)], b'\x33' * 70),
+        ]))
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            expected = {}
+            for offset, entries in iter_ifds(fh, header):
+                digest = compute_ifd_tile_hash(fh, header, entries)
+                if digest is not None:
+                    expected[offset] = digest
+        assert len(expected) == 3
+        assert compute_image_hashes(f) == expected
+
     def test_empty_for_invalid_file(self, tmp_path):
         bad = tmp_path / 'bad.tif'
         bad.write_bytes(b'NOT A TIFF')
         hashes = compute_image_hashes(bad)
         assert hashes == {}
 
+    def test_unknown_algorithm_rejected(self, tmp_tiff_with_strips):
+        with pytest.raises(ValueError):
+            compute_image_hashes(tmp_tiff_with_strips, algorithm='md5')
+
+    def test_blake3(self, tmp_tiff_with_strips):
+        pytest.importorskip('blake3')
+        sha = compute_image_hashes(tmp_tiff_with_strips)
+        b3 = compute_image_hashes(tmp_tiff_with_strips, algorithm='blake3')
+        assert b3.keys() == sha.keys()
+        assert b3 != sha
+        assert b3 == compute_image_hashes(tmp_tiff_with_strips,
+                                          algorithm='blake3')
+
 
 class TestIsIFDImageBlanked:
     """Test detection of blanked/non-blanked image data."""
@@ -118,6 +181,50 @@ class TestIsIFDImageBlanked:
             _, entries = iter_ifds(f, header)[0]
             assert is_ifd_image_blanked(f, header, entries)
 
+    def test_blank_strip_contents(self):
+        """Every strip becomes the blank JPEG + zeros, whatever its size."""
+        from pathsafe.tiff import _BLANK_JPEG
+        sizes = [100, 2000, 2000, (1 << 20) + 5000]
+        data_start = 8 + 2 + 12 * 2 + 4 + 16 * 2
+        offsets = [data_start + sum(sizes[:i]) for i in range(len(sizes))]
+        entries = [
+            (273, 4, 4, struct.pack('<4I', *offsets)),
+            (279, 4, 4, struct.pack('<4I', *sizes)),
+        ]
+        f = io.BytesIO(build_tiff(entries,
+                                  extra_data=b'\xab' * sum(sizes)))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        assert blank_ifd_image_data(f, header, ifd_entries) == sum(sizes)
+        content = f.getvalue()
+        assert len(content) == data_start + sum(sizes)
+        assert content[offsets[0]:offsets[1]] == b'\x00' * 100
+        for off, cnt in zip(offsets[1:], sizes[1:]):
+            tile = content[off:off + cnt]
+            assert tile == _BLANK_JPEG + b'\x00' * (cnt - len(_BLANK_JPEG))
+
+    def test_blank_out_of_order_strips(self):
+        """Strips stored in reverse order are all blanked, data between kept."""
+        from pathsafe.tiff import _BLANK_JPEG
+        data_start = 8 + 2 + 12 * 2 + 4 + 12 * 2
+        # Disk layout: strip 2, gap, strip 1, strip 0
+        offsets = [data_start + 2000 + 16 + 1000, data_start + 2016, data_start]
+        sizes = [700, 1000, 2000]
+        entries = [
+            (273, 4, 3, struct.pack('<3I', *offsets)),
+            (279, 4, 3, struct.pack('<3I', *sizes)),
+        ]
+        extra = b'\xab' * 2000 + b'GAP-KEEP' * 2 + b'\xab' * 1700
+        f = io.BytesIO(build_tiff(entries, extra_data=extra))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        assert blank_ifd_image_data(f, header, ifd_entries) == sum(sizes)
+        content = f.getvalue()
+        assert content[data_start + 2000:data_start + 2016] == b'GAP-KEEP' * 2
+        for off, cnt in zip(offsets, sizes):
+            tile = content[off:off + cnt]
+            assert tile == _BLANK_JPEG + b'\x00' * (cnt - len(_BLANK_JPEG))
+
     def test_no_strips_not_blanked(self, tmp_ndpi):
         with open(tmp_ndpi, 'rb') as f:
             header = read_header(f)
@@ -155,6 +262,37 @@ class TestGetIFDImageDataSize:
         assert size == 0
 
 
+class TestFindImageDataEntries:
+    """Test strip/tile offset and byte-count entry lookup."""
+
+    def _entries(self, tmp_path, tags):
+        f = tmp_path / 'layout.tif'
+        f.write_bytes(build_tiff([(tag, 4, 1, 0) for tag in tags]))
+        with open(f, 'rb') as fh:
+            header = read_header(fh)
+            entries, _ = read_ifd(fh, header, header.first_ifd_offset)
+        return entries
+
+    def test_strips(self, tmp_path):
+        entries = self._entries(tmp_path, [256, 273, 279])
+        offsets, counts = find_image_data_entries(entries)
+        assert (offsets.tag_id, counts.tag_id) == (273, 279)
+
+    def test_tiles(self, tmp_path):
+        entries = self._entries(tmp_path, [256, 324, 325])
+        offsets, counts = find_image_data_entries(entries)
+        assert (offsets.tag_id, counts.tag_id) == (324, 325)
+
+    def test_strips_take_precedence(self, tmp_path):
+        entries = self._entries(tmp_path, [273, 279, 324, 325])
+        offsets, counts = find_image_data_entries(entries)
+        assert (offsets.tag_id, counts.tag_id) == (273, 279)
+
+    def test_missing(self, tmp_path):
+        entries = self._entries(tmp_path, [256, 257])
+        assert find_image_data_entries(entries) == (None, None)
+
+
 class TestICCProfile:
     """Test ICC profile (tag 34675) scanning."""
 
@@ -228,3 +366,44 @@ class TestICCProfile:
         ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
         findings = scan_extra_metadata_tags(f, header, ifd_entries)
         assert any(e.tag_id == 34675 for e, _ in findings)
+
+    def test_exclude_tags(self):
+        """Excluded tags are skipped; the rest are still reported."""
+        entries = [
+            (270, 2, 12, b'Case 12345A\x00'),
+            (34675, 2, 12, b'SN:ABC12345\x00'),
+        ]
+        f = io.BytesIO(build_tiff(entries))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        found = scan_extra_metadata_tags(f, header, ifd_entries)
+        assert [e.tag_id for e, _ in found] == [270, 34675]
+        found = scan_extra_metadata_tags(f, header, ifd_entries,
+                                         exclude_tags={270})
+        assert [e.tag_id for e, _ in found] == [34675]
+
+    def test_long_profile_preview(self):
+        """Preview of a large multibyte value is its first 200 characters."""
+        icc_text = ('Ger\u00e4t-\u00dc\u00d6-' * 500).encode('utf-8') + b'\x00'
+        entries = [
+            (256, 3, 1, 1024),
+            (34675, 7, len(icc_text), icc_text),
+        ]
+        f = io.BytesIO(build_tiff(entries))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        (entry, preview), = scan_extra_metadata_tags(f, header, ifd_entries)
+        assert entry.tag_id == 34675
+        assert preview == ('Ger\u00e4t-\u00dc\u00d6-' * 500)[:200]
+
+    def test_anonymized_value_skipped(self):
+        """A value already overwritten with X's is not reported."""
+        icc_text = b'X' * 30 + b'\x00' * 10
+        entries = [
+            (256, 3, 1, 1024),
+            (34675, 2, len(icc_text), icc_text),
+        ]
+        f = io.BytesIO(build_tiff(entries))
+        header = read_header(f)
+        ifd_entries, _ = read_ifd(f, header, header.first_ifd_offset)
+        assert scan_extra_metadata_tags(f, header, ifd_entries) == []